@@ -43,7 +43,7 @@ async def debug_monitoring():
         print(f"\n🔧 Forcing immediate check by resetting last_check_at...")
         await db.execute(text("""
             UPDATE datasets 
-            SET last_check_at = NULL 
+            SET last_check_at = NULL, updated_at = now()
             WHERE is_active = true
         """))
         await db.commit()
@@ -47,36 +47,31 @@ async def test_connection(
             except:
                 pass
             
-            # Get user permissions
+            # Get user permissions and schema information in one round-trip
             permissions = []
-            try:
-                # Check if user can read from information_schema
-                can_read_schema = await conn.fetchval("""
-                    SELECT has_schema_privilege(current_user, 'information_schema', 'USAGE')
-                """)
-                if can_read_schema:
-                    permissions.append("READ_SCHEMA")
-                
-                # Check basic table access (we'll test specific tables later)
-                permissions.append("CONNECT")
-                
-            except Exception as e:
-                # Basic connection works even if we can't check permissions
-                permissions.append("CONNECT")
-            
-            # Get schema information
             schema_info = {}
             try:
-                schemas = await conn.fetch("""
-                    SELECT schema_name 
-                    FROM information_schema.schemata 
-                    WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_toast')
-                    ORDER BY schema_name
+                catalog = await conn.fetchrow("""
+                    SELECT
+                        -- Check if user can read from information_schema
+                        has_schema_privilege(current_user, 'information_schema', 'USAGE') AS can_read_schema,
+                        ARRAY(
+                            SELECT schema_name
+                            FROM information_schema.schemata
+                            WHERE schema_name NOT IN ('information_schema', 'pg_catalog', 'pg_toast')
+                            ORDER BY schema_name
+                        ) AS available_schemas
                 """)
-                schema_info["available_schemas"] = [row["schema_name"] for row in schemas]
-            except:
+                if catalog["can_read_schema"]:
+                    permissions.append("READ_SCHEMA")
+                schema_info["available_schemas"] = list(catalog["available_schemas"])
+            except Exception:
+                # Basic connection works even if we can't read the catalog
                 schema_info["available_schemas"] = []
             
+            # Check basic table access (we'll test specific tables later)
+            permissions.append("CONNECT")
+            
             await conn.close()
             
             return DatasetConnectionTestResponse(
@@ -201,6 +196,10 @@ async def update_dataset(
     for field, value in update_data.items():
         setattr(dataset, field, value)
     
+    # Edited connection details get a fresh attempt instead of waiting out the old backoff
+    dataset.consecutive_failures = 0
+    dataset.next_retry_at = None
+    
     await db.commit()
     await db.refresh(dataset)
     
@@ -416,6 +416,7 @@ async def run_quality_checks_background(dataset_id: UUID):
     from database import AsyncSessionLocal
     
     logger = logging.getLogger("dbfriend-cloud.quality-checks")
+    dataset_name = "Unknown"
     
     async with AsyncSessionLocal() as db:
         try:
@@ -429,7 +430,9 @@ async def run_quality_checks_background(dataset_id: UUID):
                 logger.error(f"Dataset {dataset_id} not found for quality checks")
                 return
             
-            logger.info(f"🧪 Starting user-requested quality checks for dataset: {dataset.name}")
+            # run_quality_checks rolls the session back on failure, which expires the dataset
+            dataset_name = dataset.name
+            logger.info(f"🧪 Starting user-requested quality checks for dataset: {dataset_name}")
             
             # Define progress callback to update status
             def update_progress(current: int, total: int, phase: str):
@@ -454,13 +457,13 @@ async def run_quality_checks_background(dataset_id: UUID):
                 QUALITY_CHECK_STATUS[str(dataset_id)] = {
                     "status": "completed",
                     "completed_at": datetime.now(timezone.utc),
-                    "dataset_name": dataset.name,
+                    "dataset_name": dataset_name,
                     "total_checks": total_checks,
                     "failed_checks": failed_checks,
                     "check_results": check_results  # Include the actual results
                 }
                 
-                logger.info(f"✅ User-requested quality checks completed for {dataset.name}: "
+                logger.info(f"✅ User-requested quality checks completed for {dataset_name}: "
                            f"{total_checks} checks run, {failed_checks} failed")
                 
                 # Clean up status after 5 minutes to prevent memory leaks
@@ -478,17 +481,17 @@ async def run_quality_checks_background(dataset_id: UUID):
                 QUALITY_CHECK_STATUS[str(dataset_id)] = {
                     "status": "failed",
                     "failed_at": datetime.now(timezone.utc),
-                    "dataset_name": dataset.name,
+                    "dataset_name": dataset_name,
                     "error": check_results['error']
                 }
-                logger.error(f"❌ User-requested quality checks failed for {dataset.name}: {check_results['error']}")
+                logger.error(f"❌ User-requested quality checks failed for {dataset_name}: {check_results['error']}")
                 
         except Exception as e:
             # Update status to failed
             QUALITY_CHECK_STATUS[str(dataset_id)] = {
                 "status": "failed",
                 "failed_at": datetime.now(timezone.utc),
-                "dataset_name": dataset.get('name', 'Unknown') if dataset else 'Unknown',
+                "dataset_name": dataset_name,
                 "error": str(e)
             }
             logger.error(f"❌ Error in user-requested quality checks for dataset {dataset_id}: {e}") 
\ No newline at end of file
@@ -7,7 +7,7 @@ ALTER-TABLE hack by using GeoAlchemy2 with `use_typmod=False`.
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import AsyncGenerator
 
 from geoalchemy2 import Geometry
@@ -15,13 +15,19 @@ from sqlalchemy import (
     Boolean,
     CheckConstraint,
     Column,
+    Computed,
     DateTime,
     Index,
     Integer,
     JSON,
     String,
     Text,
+    bindparam,
+    func,
+    or_,
+    select,
     text,
+    update,
 )
 from sqlalchemy.dialects.postgresql import TIMESTAMP, UUID
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -37,6 +43,11 @@ engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
+    # Workers are long-lived; size the pool for concurrent monitoring and
+    # check connections on checkout so a database restart doesn't fail a cycle
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
 )
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
@@ -56,6 +67,11 @@ class Base(DeclarativeBase):  # type: ignore
 # ORM models
 # ────────────────────────────────────────────────────────────────────────────
 
+NEXT_CHECK_AT_SQL = (
+    "(last_check_at AT TIME ZONE 'UTC') + make_interval(mins => check_interval_minutes)"
+)
+
+
 class Dataset(Base):
     """A table in a customer PostGIS database that we monitor."""
     __tablename__ = "datasets"
@@ -84,6 +100,8 @@ class Dataset(Base):
         TIMESTAMP(timezone=True)
     )
     connection_error: Mapped[str | None] = mapped_column(Text)
+    consecutive_failures: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    next_retry_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
 
     # meta
     created_at: Mapped[datetime] = mapped_column(
@@ -99,6 +117,12 @@ class Dataset(Base):
     # monitoring cadence
     check_interval_minutes: Mapped[int] = mapped_column(Integer, default=60)
     last_check_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    # Stored as UTC wall time: timestamptz + interval isn't immutable, so the
+    # generated expression works on the UTC timestamp instead.
+    next_check_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=False),
+        Computed(NEXT_CHECK_AT_SQL, persisted=True),
+    )
 
     __table_args__ = (
         # Basic indexes
@@ -110,6 +134,7 @@ class Dataset(Base):
         # Performance indexes
         Index("idx_datasets_last_check", "last_check_at"),
         Index("idx_datasets_active_status", "is_active", "connection_status"),
+        Index("idx_datasets_due", "next_check_at", postgresql_where=text("is_active")),
         
         # Connection monitoring optimizations
         Index("idx_datasets_table_location", "host", "database", "schema_name", "table_name"),
@@ -253,6 +278,93 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# Database clock as UTC wall time, matching next_check_at; scheduling compares
+# against the database's clock so worker clock skew doesn't matter
+_DB_NOW_UTC = func.timezone("UTC", func.now())
+
+# Built once so every monitoring tick reuses the same statement and its compiled form.
+# Due rows are locked with SKIP LOCKED and stamped in the same statement, so
+# concurrent workers each claim a disjoint set of datasets.
+_DUE_DATASET_IDS = (
+    select(Dataset.id)
+    .where(
+        Dataset.is_active == True,
+        or_(Dataset.next_check_at.is_(None), Dataset.next_check_at <= _DB_NOW_UTC),
+        or_(
+            Dataset.connection_status != "failed",
+            Dataset.next_retry_at.is_(None),
+            Dataset.next_retry_at <= func.now(),
+        ),
+    )
+    .order_by(Dataset.next_check_at.asc().nulls_first())
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True)
+    .scalar_subquery()
+)
+_CLAIM_DUE_DATASETS_STMT = (
+    update(Dataset)
+    .where(Dataset.id.in_(_DUE_DATASET_IDS))
+    .values(last_check_at=func.now())
+    .returning(Dataset)
+    .execution_options(synchronize_session=False)
+)
+
+
+async def claim_due_datasets(db: AsyncSession, limit: int) -> list[Dataset]:
+    """
+    Claim up to `limit` due datasets by stamping last_check_at = now() and return them.
+    Datasets still inside a failure backoff are left alone. Commit promptly so the
+    row locks are released.
+    """
+    result = await db.execute(_CLAIM_DUE_DATASETS_STMT, {"limit": limit})
+    return list(result.scalars().all())
+
+
+# Earliest upcoming moment a dataset can be claimed: its next scheduled check,
+# or the end of a failed dataset's backoff (LEAST skips whichever is NULL)
+_NEXT_DUE_UTC = func.least(
+    select(func.min(Dataset.next_check_at))
+    .where(Dataset.is_active == True, Dataset.next_check_at > _DB_NOW_UTC)
+    .scalar_subquery(),
+    select(func.min(func.timezone("UTC", Dataset.next_retry_at)))
+    .where(
+        Dataset.is_active == True,
+        Dataset.connection_status == "failed",
+        Dataset.next_retry_at > func.now(),
+    )
+    .scalar_subquery(),
+)
+_NEXT_CHECK_STMT = select(func.extract("epoch", _NEXT_DUE_UTC - _DB_NOW_UTC))
+
+
+async def fetch_seconds_until_next_check(db: AsyncSession) -> float | None:
+    """Seconds until the next active dataset becomes due or leaves backoff, or None if none is scheduled."""
+    seconds = (await db.execute(_NEXT_CHECK_STMT)).scalar()
+    return float(seconds) if seconds is not None else None
+
+
+FAILURE_BACKOFF_MAX_FACTOR = 32
+
+
+def failure_retry_at(now: datetime, consecutive_failures: int, check_interval_minutes: int) -> datetime:
+    """When to retry a failing dataset: 2, 4, 8 ... check intervals, capped at FAILURE_BACKOFF_MAX_FACTOR."""
+    factor = min(FAILURE_BACKOFF_MAX_FACTOR, 2 ** max(consecutive_failures, 1))
+    return now + timedelta(minutes=check_interval_minutes * factor)
+
+
+def in_failure_backoff(dataset: Dataset, now: datetime) -> bool:
+    """True while a failing dataset is waiting out its retry backoff."""
+    return (
+        dataset.connection_status == "failed"
+        and dataset.next_retry_at is not None
+        and now < dataset.next_retry_at
+    )
+
+
+# NOTIFY channel raised when a dataset is added or becomes due sooner than scheduled
+DATASET_CHANGED_CHANNEL = "dataset_changed"
+
+
 async def init_db() -> None:
     """Initialize database with smart restart behavior."""
     import logging
@@ -275,6 +387,7 @@ async def init_db() -> None:
                 await conn.run_sync(Base.metadata.drop_all)
                 await conn.run_sync(Base.metadata.create_all)
                 
+            await _ensure_dataset_notify_trigger(conn)
             await _apply_postgres_optimizations(conn)
         logger.info("✓ dbfriend-cloud database initialised")
     except Exception as exc:  # pragma: no cover
@@ -308,6 +421,20 @@ async def _smart_restart_reset(conn) -> None:
     await conn.run_sync(Base.metadata.create_all)
     logger.info("✓ Ensured all tables exist")
     
+    # Add scheduling columns to datasets tables created before they existed,
+    # in one ALTER so the table's exclusive lock is taken once
+    await conn.execute(text(f"""
+        ALTER TABLE datasets
+            ADD COLUMN IF NOT EXISTS next_check_at timestamp
+                GENERATED ALWAYS AS ({NEXT_CHECK_AT_SQL}) STORED,
+            ADD COLUMN IF NOT EXISTS consecutive_failures integer NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS next_retry_at timestamptz
+    """))
+    await conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_datasets_due
+        ON datasets (next_check_at) WHERE is_active
+    """))
+    
     # Clear monitoring data in dependency order (preserve datasets table)
     await conn.execute(text("DELETE FROM spatial_checks"))
     logger.info("✓ Cleared spatial_checks")
@@ -324,7 +451,11 @@ async def _smart_restart_reset(conn) -> None:
             last_check_at = NULL,
             connection_status = 'unknown',
             connection_error = NULL,
-            last_connection_test = NULL
+            last_connection_test = NULL,
+            consecutive_failures = 0,
+            next_retry_at = NULL,
+            -- Raw SQL skips the ORM onupdate; bump it so schedule caches reload
+            updated_at = now()
         WHERE true
     """))
     
@@ -365,6 +496,39 @@ async def _smart_restart_reset(conn) -> None:
     logger.info(f"📊 Smart restart complete: {active_datasets} connections preserved, monitoring reset")
 
 
+async def _ensure_dataset_notify_trigger(conn) -> None:
+    """Install the datasets trigger that wakes workers through DATASET_CHANGED_CHANNEL."""
+    import logging
+
+    logger = logging.getLogger("dbfriend-cloud")
+    try:
+        # Only changes that can make a dataset due earlier notify; routine
+        # last_check_at writes push next_check_at later and stay silent.
+        await conn.execute(text(f"""
+            CREATE OR REPLACE FUNCTION notify_dataset_changed() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM pg_notify('{DATASET_CHANGED_CHANNEL}', NEW.id::text);
+                ELSIF (NEW.is_active AND NOT OLD.is_active)
+                   OR (NEW.next_check_at IS NULL AND OLD.next_check_at IS NOT NULL)
+                   OR NEW.next_check_at < OLD.next_check_at THEN
+                    PERFORM pg_notify('{DATASET_CHANGED_CHANNEL}', NEW.id::text);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        await conn.execute(text("DROP TRIGGER IF EXISTS datasets_notify_changed ON datasets"))
+        await conn.execute(text("""
+            CREATE TRIGGER datasets_notify_changed
+            AFTER INSERT OR UPDATE ON datasets
+            FOR EACH ROW EXECUTE FUNCTION notify_dataset_changed()
+        """))
+        logger.info("✓ Dataset change notifications enabled")
+    except Exception as exc:
+        logger.warning(f"Could not install dataset change trigger (workers will poll): {exc}")
+
+
 async def _apply_postgres_optimizations(conn) -> None:
     """Set TOAST compression + external storage for heavy columns."""
     import logging
@@ -413,4 +577,5 @@ async def reset_db_for_development() -> None:
         await _ensure_postgis_extension(conn)
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        await _ensure_dataset_notify_trigger(conn)
         await _apply_postgres_optimizations(conn)
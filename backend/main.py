@@ -8,7 +8,7 @@ import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 from rich.console import Console
 from rich.logging import RichHandler
@@ -63,6 +63,9 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    # orjson serializes responses several times faster than the stdlib encoder,
+    # which matters for the GeoJSON-heavy geometry endpoints
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
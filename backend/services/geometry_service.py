@@ -5,27 +5,59 @@ Implements advanced geometry comparison using PostGIS spatial functions
 
 import hashlib
 import logging
+import math
 from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, selectinload
 from geoalchemy2 import functions as spatial_func
-from geoalchemy2.elements import WKTElement
-import geopandas as gpd
-import pandas as pd
-from shapely.geometry import shape
-from shapely import wkb
+from geoalchemy2.elements import WKBElement
+from blake3 import blake3
+import orjson
 
 from database import GeometrySnapshot, GeometryDiff, SpatialCheck, Dataset
 from models import GeometryImportResponse
 from config import settings
-from .test_config import TestConfig
+from .test_config import TestConfig, cfg
+from .spatial_tests import (
+    GEOMETRY_TYPE_ID_SQL, LINE_TYPE_IDS, POINT_TYPE_IDS, POLYGON_TYPE_IDS,
+    SpatialTestRunner, get_geometry_type_id,
+)
 
 logger = logging.getLogger("dbfriend-cloud.geometry_service")
 
+# Attribute and composite hashes only detect changes, so they use BLAKE3
+# instead of MD5; the prefix keeps them from ever matching a legacy MD5 digest
+CHANGE_HASH_PREFIX = "b3:"
+
+
+# Confidence-scoring thresholds, read once at import; cfg() raises on a missing key
+_LARGE_AREA_THRESHOLD = cfg("area.large_area_threshold")
+_LARGE_LENGTH_THRESHOLD = cfg("area.large_length_threshold")
+_MIN_POLYGON_POINTS = cfg("validity.min_polygon_points")
+_MIN_LINESTRING_POINTS = cfg("validity.min_linestring_points")
+_MAX_COORDINATE_MAGNITUDE = cfg("validity.max_coordinate_magnitude")
+
+
+def _change_hash(data: bytes) -> str:
+    """128-bit BLAKE3 hex digest with the change-hash version prefix."""
+    return CHANGE_HASH_PREFIX + blake3(data).hexdigest(length=16)
+
+
+def _geometry_hash_sql(column: str) -> str:
+    """SQL expression for a source geometry's hash, optionally grid-snapped first."""
+    if settings.GEOMETRY_HASH_GRID_SIZE:
+        return f"MD5(ST_AsBinary(ST_SnapToGrid({column}, {settings.GEOMETRY_HASH_GRID_SIZE!r})))"
+    return f"MD5(ST_AsBinary({column}))"
+
+
+def _quote_ident(name: str) -> str:
+    """Quote a column name for interpolation into external queries."""
+    return '"' + name.replace('"', '""') + '"'
+
 
 class GeometryService:
     """Service for handling geometry operations and diff detection."""
@@ -39,37 +71,33 @@ class GeometryService:
         return hashlib.md5(geometry_wkb).hexdigest()
     
     @staticmethod
-    def compute_attributes_hash(attributes: Dict[str, Any]) -> str:
-        """Compute MD5 hash of feature attributes."""
+    def compute_attributes_hash(attributes: Dict[str, Any], presorted: bool = False) -> str:
+        """
+        Compute BLAKE3 hash of feature attributes.
+        Pass presorted=True when the dict was built in key order to skip the per-call sort.
+        """
         if not attributes:
-            return hashlib.md5("".encode()).hexdigest()
+            return _change_hash(b"")
         
         # Sort attributes for consistent hashing
-        sorted_attrs = sorted(attributes.items())
+        sorted_attrs = attributes.items() if presorted else sorted(attributes.items())
         attrs_string = "|".join([f"{k}:{v}" for k, v in sorted_attrs])
-        return hashlib.md5(attrs_string.encode('utf-8')).hexdigest()
+        return _change_hash(attrs_string.encode('utf-8'))
     
     @staticmethod
     def compute_composite_hash(geometry_hash: str, attributes_hash: str) -> str:
         """Compute composite hash combining geometry and attributes."""
         composite_string = f"geom:{geometry_hash}|attrs:{attributes_hash}"
-        return hashlib.md5(composite_string.encode('utf-8')).hexdigest()
+        return _change_hash(composite_string.encode('utf-8'))
     
     @staticmethod
-    def create_wkt_element(geometry_wkb: bytes, srid: int = 4326) -> WKTElement:
+    def create_geometry_element(geometry_ewkb: bytes, srid: int = 4326) -> WKBElement:
         """
-        Create a WKTElement from WKB that handles 2D/3D/4D geometries safely.
-        Returns WKTElement compatible with PostGIS.
+        Wrap source EWKB (from ST_AsEWKB) for insertion.
+        PostGIS parses it directly, keeping 2D/3D/4D coordinates as-is, so
+        there's no per-row Shapely parse and WKT round-trip in Python.
         """
-        try:
-            geom = wkb.loads(geometry_wkb)
-            # Let PostGIS handle the geometry as-is, don't force dimensions
-            wkt_string = geom.wkt
-            return WKTElement(f"SRID={srid};{wkt_string}")
-        except Exception as e:
-            logger.error(f"Error creating WKT from WKB: {e}")
-            # Fallback: try to get basic geometry info
-            return WKTElement(f"SRID={srid};POINT EMPTY")
+        return WKBElement(geometry_ewkb, srid=srid, extended=True)
     
     async def monitor_dataset_changes(
         self, 
@@ -79,6 +107,10 @@ class GeometryService:
         """
         Monitor dataset for CHANGES only - separate from quality checks.
         Only flags geometries that pass the "problematic" threshold.
+        
+        The run's writes commit with synchronous_commit off: everything written
+        here is derived from the source table, so a crash that loses the last
+        commit only means the next check detects the same changes again.
         """
         start_time = datetime.now(timezone.utc)
         
@@ -89,12 +121,47 @@ class GeometryService:
             external_conn = await asyncpg.connect(dataset.connection_string)
             
             try:
+                # Get existing snapshots for comparison (from our internal database)
+                existing_snapshots = await self._get_existing_snapshots(dataset.id)
+                existing_hashes = {snap.composite_hash: snap for snap in existing_snapshots}
+                # Index by geometry hash too, so classifying a change is a lookup rather
+                # than a scan of every snapshot; the first snapshot per geometry wins
+                existing_by_geometry_hash: Dict[str, GeometrySnapshot] = {}
+                for snap in existing_snapshots:
+                    existing_by_geometry_hash.setdefault(snap.geometry_hash, snap)
+                
+                # Check if this is the first time monitoring this dataset (baseline establishment)
+                is_baseline_run = len(existing_snapshots) == 0
+                
+                # Select the attribute columns explicitly so the raw geometry column
+                # isn't shipped; geometry bytes are only fetched where snapshots need them
+                # Read pg_attribute directly: information_schema.columns is a view
+                # over several catalogs with per-row privilege checks
+                column_rows = await external_conn.fetch(
+                    """
+                    SELECT attname AS column_name FROM pg_catalog.pg_attribute
+                    WHERE attrelid = format('%I.%I', $1::text, $2::text)::regclass
+                      AND attnum > 0 AND NOT attisdropped
+                    ORDER BY attnum
+                    """,
+                    dataset.schema_name, dataset.table_name
+                )
+                attribute_columns = "".join(
+                    f"{_quote_ident(r['column_name'])}, "
+                    for r in column_rows
+                    if r['column_name'] != dataset.geometry_column
+                )
+                geometry_ewkb_column = (
+                    f"ST_AsEWKB(ST_SetSRID({dataset.geometry_column}, 4326)) as geometry_ewkb,"
+                    if is_baseline_run else ""
+                )
+                
                 # Query external PostGIS database for current geometry state
                 external_query = f"""
                     SELECT 
-                        *,
-                        ST_AsBinary({dataset.geometry_column}) as geometry_wkb,
-                        MD5(ST_AsBinary({dataset.geometry_column})) as geometry_hash,
+                        {attribute_columns}
+                        {geometry_ewkb_column}
+                        {_geometry_hash_sql(dataset.geometry_column)} as geometry_hash,
                         ST_IsValid({dataset.geometry_column}) as is_valid,
                         ST_IsValidReason({dataset.geometry_column}) as validity_reason,
                         ST_IsSimple({dataset.geometry_column}) as is_simple,
@@ -102,6 +169,7 @@ class GeometryService:
                         ST_Length({dataset.geometry_column}) as geom_length,
                         ST_NPoints({dataset.geometry_column}) as num_points,
                         ST_GeometryType({dataset.geometry_column}) as geom_type,
+                        {GEOMETRY_TYPE_ID_SQL.format(column=dataset.geometry_column)} as geom_type_id,
                         -- Ring orientation check (for polygons)
                         CASE 
                             WHEN ST_GeometryType({dataset.geometry_column}) LIKE '%Polygon%' 
@@ -125,161 +193,127 @@ class GeometryService:
                 snapshots_created = 0
                 diffs_detected = 0
                 
-                # Get existing snapshots for comparison (from our internal database)
-                existing_snapshots = await self._get_existing_snapshots(dataset.id)
-                existing_hashes = {snap.composite_hash: snap for snap in existing_snapshots}
-                
                 logger.info(f"Dataset {dataset.id}: Found {len(existing_snapshots)} existing snapshots")
                 
                 logger.info(f"Found {len(external_rows)} geometries in external database, {len(existing_snapshots)} existing snapshots")
                 logger.debug(f"Existing composite hashes: {len(existing_hashes)} unique")
                 
-                # Check if this is the first time monitoring this dataset (baseline establishment)
-                is_baseline_run = len(existing_snapshots) == 0
-                
                 if is_baseline_run:
                     logger.info(f"📊 BASELINE RUN: Establishing baseline for {len(external_rows)} geometries (no diffs will be created)")
                 else:
                     logger.info(f"🔍 CHANGE DETECTION: Comparing {len(external_rows)} current vs {len(existing_snapshots)} baseline geometries")
                 
-                # Process each external geometry
+                # Hash every feature once; the same hashes drive change and deletion detection.
+                # Baseline runs snapshot every feature; change detection runs only keep
+                # the ones whose composite hash isn't already known, so unchanged rows
+                # don't hold on to their attributes dicts for the rest of the run
+                rows_to_process = []
+                current_hashes = set()
+                excluded_keys = {
+                    dataset.geometry_column, 'geometry_ewkb', 'geometry_hash', 'is_valid', 'geom_area', 'geom_type_id'
+                }
+                # Every record has the same columns, so filter and sort the attribute keys once
+                attribute_keys = (
+                    sorted(key for key in external_rows[0].keys() if key not in excluded_keys)
+                    if external_rows else []
+                )
                 for row in external_rows:
+                    # Build attributes dict in key order (geometry columns excluded)
+                    attributes = {}
+                    for key in attribute_keys:
+                        value = row[key]
+                        # Convert any special types to JSON-serializable
+                        if value is not None:
+                            attributes[key] = str(value) if not isinstance(value, (str, int, float, bool)) else value
+                    
+                    attributes_hash = self.compute_attributes_hash(attributes, presorted=True)
+                    composite_hash = self.compute_composite_hash(row['geometry_hash'], attributes_hash)
+                    current_hashes.add(composite_hash)
+                    if is_baseline_run or composite_hash not in existing_hashes:
+                        rows_to_process.append((row, attributes, attributes_hash, composite_hash))
+                
+                if not is_baseline_run:
+                    logger.info(f"🔍 {len(rows_to_process)} new or changed geometries, "
+                                f"{len(external_rows) - len(rows_to_process)} unchanged")
+                
+                # Change detection runs only fetch geometry bytes for features that changed
+                geometry_ewkb_by_hash = {}
+                if not is_baseline_run:
+                    new_geometry_hashes = list({row['geometry_hash'] for row, _, _, _ in rows_to_process})
+                    if new_geometry_hashes:
+                        ewkb_rows = await external_conn.fetch(
+                            f"""
+                            SELECT
+                                {_geometry_hash_sql(dataset.geometry_column)} as geometry_hash,
+                                ST_AsEWKB(ST_SetSRID({dataset.geometry_column}, 4326)) as geometry_ewkb
+                            FROM {dataset.schema_name}.{dataset.table_name}
+                            WHERE {_geometry_hash_sql(dataset.geometry_column)} = ANY($1::text[])
+                            """,
+                            new_geometry_hashes
+                        )
+                        geometry_ewkb_by_hash = {r['geometry_hash']: r['geometry_ewkb'] for r in ewkb_rows}
+                
+                # Don't wait on the WAL flush when committing derived data (see docstring)
+                await self.db.execute(text("SET LOCAL synchronous_commit = off"))
+                
+                # Process each new or changed external geometry
+                baseline_snapshots = []
+                for row, attributes, attributes_hash, composite_hash in rows_to_process:
                     # Extract geometry and attributes
-                    geometry_wkb = row['geometry_wkb']
                     geometry_hash = row['geometry_hash']
+                    geometry_ewkb = (
+                        row['geometry_ewkb'] if is_baseline_run
+                        else geometry_ewkb_by_hash.get(geometry_hash)
+                    )
                     is_valid = row['is_valid']
                     geom_area = row['geom_area'] or 0
                     
-                    # Build attributes dict (exclude geometry columns)
-                    attributes = {}
-                    for key, value in row.items():
-                        if key not in [dataset.geometry_column, 'geometry_wkb', 'geometry_hash', 'is_valid', 'geom_area']:
-                            # Convert any special types to JSON-serializable
-                            if value is not None:
-                                attributes[key] = str(value) if not isinstance(value, (str, int, float, bool)) else value
-                    
-                    attributes_hash = self.compute_attributes_hash(attributes)
-                    composite_hash = self.compute_composite_hash(geometry_hash, attributes_hash)
-                    
-                    # Check if this is a new or changed geometry
-                    is_new_geometry = composite_hash not in existing_hashes
-                    
                     if is_baseline_run:
-                        # BASELINE RUN: Create snapshots for all geometries, no diffs
-                        logger.debug(f"📊 Baseline geometry: composite={composite_hash[:8]}..., geom={geometry_hash[:8]}...")
-                        try:
-                            snapshot = GeometrySnapshot(
-                                dataset_id=dataset.id,
-                                source_id=str(attributes.get('id') or attributes.get('gid') or ''),
-                                geometry_hash=geometry_hash,
-                                attributes_hash=attributes_hash,
-                                composite_hash=composite_hash,
-                                geometry=self.create_wkt_element(geometry_wkb),
-                                attributes=attributes
-                            )
-                            self.db.add(snapshot)
-                            await self.db.flush()
-                            snapshots_created += 1
-                        except Exception as snapshot_error:
-                            # Check if this is a dimension constraint violation
-                            error_str = str(snapshot_error)
-                            if "enforce_dims_geometry" in error_str or "violates check constraint" in error_str:
-                                logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
-                                await self.db.rollback()
-                                await self._ensure_mixed_dimension_support()
-                                
-                                # Retry the snapshot creation
-                                try:
-                                    snapshot = GeometrySnapshot(
-                                        dataset_id=dataset.id,
-                                        source_id=str(attributes.get('id') or attributes.get('gid') or ''),
-                                        geometry_hash=geometry_hash,
-                                        attributes_hash=attributes_hash,
-                                        composite_hash=composite_hash,
-                                        geometry=self.create_wkt_element(geometry_wkb),
-                                        attributes=attributes
-                                    )
-                                    self.db.add(snapshot)
-                                    await self.db.flush()
-                                    snapshots_created += 1
-                                    logger.info(f"✅ Successfully created snapshot after constraint fix")
-                                except Exception as retry_error:
-                                    logger.error(f"Failed to create snapshot even after constraint fix: {retry_error}")
-                                    continue
-                            else:
-                                logger.error(f"Error creating baseline snapshot for geometry {geometry_hash}: {snapshot_error}")
-                                continue
+                        # BASELINE RUN: Create snapshots for all geometries, no diffs.
+                        # They're flushed in batches, not one INSERT round-trip per feature.
+                        logger.debug("📊 Baseline geometry: composite=%.8s..., geom=%.8s...", composite_hash, geometry_hash)
+                        snapshot = GeometrySnapshot(
+                            dataset_id=dataset.id,
+                            source_id=str(attributes.get('id') or attributes.get('gid') or ''),
+                            geometry_hash=geometry_hash,
+                            attributes_hash=attributes_hash,
+                            composite_hash=composite_hash,
+                            geometry=self.create_geometry_element(geometry_ewkb),
+                            attributes=attributes
+                        )
+                        self.db.add(snapshot)
+                        baseline_snapshots.append(snapshot)
+                        if len(baseline_snapshots) % settings.DIFF_BATCH_SIZE == 0:
+                            await self._flush_baseline_snapshots(baseline_snapshots)
                     else:
-                        # CHANGE DETECTION RUN: Only process actual changes
-                        if is_new_geometry:
-                            logger.info(f"🆕 NEW geometry detected: composite={composite_hash[:8]}..., geom={geometry_hash[:8]}..., attrs={attributes_hash[:8]}...")
+                        # CHANGE DETECTION RUN: rows_to_process only holds actual changes
+                        logger.info("🆕 NEW geometry detected: composite=%.8s..., geom=%.8s..., attrs=%.8s...",
+                                    composite_hash, geometry_hash, attributes_hash)
+                        
+                        # ⚠️ THRESHOLD CHECK: Only flag if geometry is "problematic"
+                        is_problematic = self._is_geometry_problematic(row)
+                        logger.debug("New geometry detected: %.8s... (problematic: %s)", geometry_hash, is_problematic)
+                        
+                        if is_problematic:
+                            # Check if we already have a pending diff for this geometry IN THIS DATASET
+                            existing_pending_diff = await self.db.execute(
+                                select(GeometryDiff)
+                                .join(GeometrySnapshot, GeometryDiff.new_snapshot_id == GeometrySnapshot.id)
+                                .where(
+                                    GeometrySnapshot.dataset_id == dataset.id,
+                                    GeometrySnapshot.geometry_hash == geometry_hash,
+                                    GeometryDiff.status == "PENDING"
+                                )
+                            )
+                            existing_diff_obj = existing_pending_diff.scalar_one_or_none()
+                            has_pending_diff = existing_diff_obj is not None
                             
-                            logger.debug(f"New geometry detected: {geometry_hash[:8]}... (problematic: {self._is_geometry_problematic(row)})")
+                            if has_pending_diff:
+                                logger.info(f"🔍 Found existing pending diff: diff_id={existing_diff_obj.id}, dataset={dataset.id}, geom_hash={geometry_hash[:8]}")
                             
-                            # ⚠️ THRESHOLD CHECK: Only flag if geometry is "problematic"
-                            if self._is_geometry_problematic(row):
-                                # Check if we already have a pending diff for this geometry IN THIS DATASET
-                                existing_pending_diff = await self.db.execute(
-                                    select(GeometryDiff)
-                                    .join(GeometrySnapshot, GeometryDiff.new_snapshot_id == GeometrySnapshot.id)
-                                    .where(
-                                        GeometrySnapshot.dataset_id == dataset.id,
-                                        GeometrySnapshot.geometry_hash == geometry_hash,
-                                        GeometryDiff.status == "PENDING"
-                                    )
-                                )
-                                existing_diff_obj = existing_pending_diff.scalar_one_or_none()
-                                has_pending_diff = existing_diff_obj is not None
-                                
-                                if has_pending_diff:
-                                    logger.info(f"🔍 Found existing pending diff: diff_id={existing_diff_obj.id}, dataset={dataset.id}, geom_hash={geometry_hash[:8]}")
-                                
-                                if has_pending_diff:
-                                    logger.info(f"⏭️ Pending diff already exists for geometry {geometry_hash[:8]}... IN DATASET {dataset.id}, skipping")
-                                    # Still create snapshot for completeness
-                                    try:
-                                        snapshot = GeometrySnapshot(
-                                            dataset_id=dataset.id,
-                                            source_id=str(attributes.get('id') or attributes.get('gid') or ''),
-                                            geometry_hash=geometry_hash,
-                                            attributes_hash=attributes_hash,
-                                            composite_hash=composite_hash,
-                                            geometry=self.create_wkt_element(geometry_wkb),
-                                            attributes=attributes
-                                        )
-                                        self.db.add(snapshot)
-                                        await self.db.flush()
-                                        snapshots_created += 1
-                                    except Exception as snapshot_error:
-                                        # Check if this is a dimension constraint violation
-                                        error_str = str(snapshot_error)
-                                        if "enforce_dims_geometry" in error_str or "violates check constraint" in error_str:
-                                            logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
-                                            await self.db.rollback()
-                                            await self._ensure_mixed_dimension_support()
-                                            
-                                            # Retry the snapshot creation
-                                            try:
-                                                snapshot = GeometrySnapshot(
-                                                    dataset_id=dataset.id,
-                                                    source_id=str(attributes.get('id') or attributes.get('gid') or ''),
-                                                    geometry_hash=geometry_hash,
-                                                    attributes_hash=attributes_hash,
-                                                    composite_hash=composite_hash,
-                                                    geometry=self.create_wkt_element(geometry_wkb),
-                                                    attributes=attributes
-                                                )
-                                                self.db.add(snapshot)
-                                                await self.db.flush()
-                                                snapshots_created += 1
-                                                logger.info(f"✅ Successfully created completeness snapshot after constraint fix")
-                                            except Exception as retry_error:
-                                                logger.error(f"Failed to create completeness snapshot even after constraint fix: {retry_error}")
-                                        else:
-                                            logger.error(f"Error creating snapshot for geometry {geometry_hash}: {snapshot_error}")
-                                        continue
-                            else:
-                                # Geometry is not problematic - just create snapshot, no diff
+                            if has_pending_diff:
+                                logger.info(f"⏭️ Pending diff already exists for geometry {geometry_hash[:8]}... IN DATASET {dataset.id}, skipping")
+                                # Still create snapshot for completeness
                                 try:
                                     snapshot = GeometrySnapshot(
                                         dataset_id=dataset.id,
@@ -287,14 +321,14 @@ class GeometryService:
                                         geometry_hash=geometry_hash,
                                         attributes_hash=attributes_hash,
                                         composite_hash=composite_hash,
-                                        geometry=self.create_wkt_element(geometry_wkb),
+                                        geometry=self.create_geometry_element(geometry_ewkb),
                                         attributes=attributes
                                     )
                                     self.db.add(snapshot)
                                     await self.db.flush()
                                     snapshots_created += 1
                                 except Exception as snapshot_error:
-                                    # Check if this is a dimension constraint violation  
+                                    # Check if this is a dimension constraint violation
                                     error_str = str(snapshot_error)
                                     if "enforce_dims_geometry" in error_str or "violates check constraint" in error_str:
                                         logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
@@ -309,155 +343,180 @@ class GeometryService:
                                                 geometry_hash=geometry_hash,
                                                 attributes_hash=attributes_hash,
                                                 composite_hash=composite_hash,
-                                                geometry=self.create_wkt_element(geometry_wkb),
+                                                geometry=self.create_geometry_element(geometry_ewkb),
                                                 attributes=attributes
                                             )
                                             self.db.add(snapshot)
                                             await self.db.flush()
                                             snapshots_created += 1
-                                            logger.info(f"✅ Successfully created snapshot after constraint fix")
+                                            logger.info(f"✅ Successfully created completeness snapshot after constraint fix")
                                         except Exception as retry_error:
-                                            logger.error(f"Failed to create snapshot even after constraint fix: {retry_error}")
-                                            continue
+                                            logger.error(f"Failed to create completeness snapshot even after constraint fix: {retry_error}")
                                     else:
                                         logger.error(f"Error creating snapshot for geometry {geometry_hash}: {snapshot_error}")
-                                        continue
-                                
-                                try:
-                                    # Create new snapshot
-                                    snapshot = GeometrySnapshot(
-                                        dataset_id=dataset.id,
-                                        source_id=str(attributes.get('id') or attributes.get('gid') or ''),
-                                        geometry_hash=geometry_hash,
-                                        attributes_hash=attributes_hash,
-                                        composite_hash=composite_hash,
-                                        geometry=self.create_wkt_element(geometry_wkb),
-                                        attributes=attributes
-                                    )
-                                    self.db.add(snapshot)
-                                    
-                                    # Flush to get the ID without committing
-                                    await self.db.flush()
-                                    
-                                    snapshots_created += 1
-                                    
-                                    # Determine diff type and create diff record
-                                    diff_type = await self._determine_diff_type(
-                                        geometry_hash, attributes_hash, existing_snapshots
-                                    )
+                                    continue
+                        else:
+                            # Geometry is not problematic - just create snapshot, no diff
+                            try:
+                                snapshot = GeometrySnapshot(
+                                    dataset_id=dataset.id,
+                                    source_id=str(attributes.get('id') or attributes.get('gid') or ''),
+                                    geometry_hash=geometry_hash,
+                                    attributes_hash=attributes_hash,
+                                    composite_hash=composite_hash,
+                                    geometry=self.create_geometry_element(geometry_ewkb),
+                                    attributes=attributes
+                                )
+                                self.db.add(snapshot)
+                                await self.db.flush()
+                                snapshots_created += 1
+                            except Exception as snapshot_error:
+                                # Check if this is a dimension constraint violation  
+                                error_str = str(snapshot_error)
+                                if "enforce_dims_geometry" in error_str or "violates check constraint" in error_str:
+                                    logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
+                                    await self.db.rollback()
+                                    await self._ensure_mixed_dimension_support()
                                     
-                                    # Check if diff already exists for this snapshot
-                                    existing_diff_result = await self.db.execute(
-                                        select(GeometryDiff).where(
-                                            GeometryDiff.new_snapshot_id == snapshot.id
+                                    # Retry the snapshot creation
+                                    try:
+                                        snapshot = GeometrySnapshot(
+                                            dataset_id=dataset.id,
+                                            source_id=str(attributes.get('id') or attributes.get('gid') or ''),
+                                            geometry_hash=geometry_hash,
+                                            attributes_hash=attributes_hash,
+                                            composite_hash=composite_hash,
+                                            geometry=self.create_geometry_element(geometry_ewkb),
+                                            attributes=attributes
                                         )
-                                    )
-                                    existing_diff = existing_diff_result.scalar_one_or_none()
-                                    
-                                    if existing_diff:
-                                        logger.debug(f"Diff already exists for snapshot {snapshot.id}, skipping")
+                                        self.db.add(snapshot)
+                                        await self.db.flush()
+                                        snapshots_created += 1
+                                        logger.info(f"✅ Successfully created snapshot after constraint fix")
+                                    except Exception as retry_error:
+                                        logger.error(f"Failed to create snapshot even after constraint fix: {retry_error}")
                                         continue
-                                    
-                                    # Create diff record ONLY for problematic geometries
-                                    diff = GeometryDiff(
-                                        dataset_id=dataset.id,
-                                        diff_type=diff_type,
-                                        old_snapshot_id=None,  # Will be set if needed
-                                        new_snapshot_id=snapshot.id,
-                                        geometry_changed=True,
-                                        attributes_changed=False,
-                                        confidence_score=self._calculate_confidence_score(row)
+                                else:
+                                    logger.error(f"Error creating snapshot for geometry {geometry_hash}: {snapshot_error}")
+                                    continue
+                            
+                            try:
+                                # Create new snapshot
+                                snapshot = GeometrySnapshot(
+                                    dataset_id=dataset.id,
+                                    source_id=str(attributes.get('id') or attributes.get('gid') or ''),
+                                    geometry_hash=geometry_hash,
+                                    attributes_hash=attributes_hash,
+                                    composite_hash=composite_hash,
+                                    geometry=self.create_geometry_element(geometry_ewkb),
+                                    attributes=attributes
+                                )
+                                self.db.add(snapshot)
+                                
+                                # Flush to get the ID without committing
+                                await self.db.flush()
+                                
+                                snapshots_created += 1
+                                
+                                # Determine diff type and create diff record
+                                diff_type = await self._determine_diff_type(
+                                    geometry_hash, attributes_hash, existing_by_geometry_hash
+                                )
+                                
+                                # Check if diff already exists for this snapshot
+                                existing_diff_result = await self.db.execute(
+                                    select(GeometryDiff).where(
+                                        GeometryDiff.new_snapshot_id == snapshot.id
                                     )
+                                )
+                                existing_diff = existing_diff_result.scalar_one_or_none()
+                                
+                                if existing_diff:
+                                    logger.debug(f"Diff already exists for snapshot {snapshot.id}, skipping")
+                                    continue
+                                
+                                # Create diff record ONLY for problematic geometries
+                                diff = GeometryDiff(
+                                    dataset_id=dataset.id,
+                                    diff_type=diff_type,
+                                    old_snapshot_id=None,  # Will be set if needed
+                                    new_snapshot_id=snapshot.id,
+                                    geometry_changed=True,
+                                    attributes_changed=False,
+                                    confidence_score=self._calculate_confidence_score(row)
+                                )
+                                
+                                if diff_type == "UPDATED":
+                                    # The old snapshot has the same geometry but different attributes
+                                    existing_snapshot = existing_by_geometry_hash[geometry_hash]
+                                    diff.old_snapshot_id = existing_snapshot.id
+                                    diff.geometry_changed = False
+                                    diff.attributes_changed = True
+                                
+                                self.db.add(diff)
+                                diffs_detected += 1
+                                logger.info(f"🚨 Created {diff_type} diff for geometry {geometry_hash[:8]}... (confidence: {diff.confidence_score})")
+                                
+                            except Exception as snapshot_error:
+                                # Check if this is a dimension constraint violation
+                                error_str = str(snapshot_error)
+                                if "enforce_dims_geometry" in error_str or "violates check constraint" in error_str:
+                                    logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
+                                    await self.db.rollback()
+                                    await self._ensure_mixed_dimension_support()
                                     
-                                    if diff_type == "UPDATED":
-                                        # Find the old snapshot with same geometry but different attributes
-                                        for existing_snapshot in existing_snapshots:
-                                            if existing_snapshot.geometry_hash == geometry_hash:
-                                                diff.old_snapshot_id = existing_snapshot.id
-                                                diff.geometry_changed = False
-                                                diff.attributes_changed = True
-                                                break
-                                    
-                                    self.db.add(diff)
-                                    diffs_detected += 1
-                                    logger.info(f"🚨 Created {diff_type} diff for geometry {geometry_hash[:8]}... (confidence: {diff.confidence_score})")
-                                    
-                                except Exception as snapshot_error:
-                                    # Check if this is a dimension constraint violation
-                                    error_str = str(snapshot_error)
-                                    if "enforce_dims_geometry" in error_str or "violates check constraint" in error_str:
-                                        logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
-                                        await self.db.rollback()
-                                        await self._ensure_mixed_dimension_support()
+                                    # Retry the snapshot and diff creation
+                                    try:
+                                        snapshot = GeometrySnapshot(
+                                            dataset_id=dataset.id,
+                                            source_id=str(attributes.get('id') or attributes.get('gid') or ''),
+                                            geometry_hash=geometry_hash,
+                                            attributes_hash=attributes_hash,
+                                            composite_hash=composite_hash,
+                                            geometry=self.create_geometry_element(geometry_ewkb),
+                                            attributes=attributes
+                                        )
+                                        self.db.add(snapshot)
+                                        await self.db.flush()
+                                        snapshots_created += 1
                                         
-                                        # Retry the snapshot and diff creation
-                                        try:
-                                            snapshot = GeometrySnapshot(
-                                                dataset_id=dataset.id,
-                                                source_id=str(attributes.get('id') or attributes.get('gid') or ''),
-                                                geometry_hash=geometry_hash,
-                                                attributes_hash=attributes_hash,
-                                                composite_hash=composite_hash,
-                                                geometry=self.create_wkt_element(geometry_wkb),
-                                                attributes=attributes
-                                            )
-                                            self.db.add(snapshot)
-                                            await self.db.flush()
-                                            snapshots_created += 1
-                                            
-                                            # Continue with diff creation logic...
-                                            diff_type = await self._determine_diff_type(
-                                                geometry_hash, attributes_hash, existing_snapshots
-                                            )
-                                            
-                                            diff = GeometryDiff(
-                                                dataset_id=dataset.id,
-                                                diff_type=diff_type,
-                                                old_snapshot_id=None,
-                                                new_snapshot_id=snapshot.id,
-                                                geometry_changed=True,
-                                                attributes_changed=False,
-                                                confidence_score=self._calculate_confidence_score(row)
-                                            )
-                                            
-                                            if diff_type == "UPDATED":
-                                                for existing_snapshot in existing_snapshots:
-                                                    if existing_snapshot.geometry_hash == geometry_hash:
-                                                        diff.old_snapshot_id = existing_snapshot.id
-                                                        diff.geometry_changed = False
-                                                        diff.attributes_changed = True
-                                                        break
-                                            
-                                            self.db.add(diff)
-                                            diffs_detected += 1
-                                            logger.info(f"✅ Successfully created snapshot and diff after constraint fix")
-                                        except Exception as retry_error:
-                                            logger.error(f"Failed to create snapshot even after constraint fix: {retry_error}")
-                                            continue
-                                    else:
-                                        logger.error(f"Error processing geometry {geometry_hash}: {snapshot_error}")
+                                        # Continue with diff creation logic...
+                                        diff_type = await self._determine_diff_type(
+                                            geometry_hash, attributes_hash, existing_by_geometry_hash
+                                        )
+                                        
+                                        diff = GeometryDiff(
+                                            dataset_id=dataset.id,
+                                            diff_type=diff_type,
+                                            old_snapshot_id=None,
+                                            new_snapshot_id=snapshot.id,
+                                            geometry_changed=True,
+                                            attributes_changed=False,
+                                            confidence_score=self._calculate_confidence_score(row)
+                                        )
+                                        
+                                        if diff_type == "UPDATED":
+                                            existing_snapshot = existing_by_geometry_hash[geometry_hash]
+                                            diff.old_snapshot_id = existing_snapshot.id
+                                            diff.geometry_changed = False
+                                            diff.attributes_changed = True
+                                        
+                                        self.db.add(diff)
+                                        diffs_detected += 1
+                                        logger.info(f"✅ Successfully created snapshot and diff after constraint fix")
+                                    except Exception as retry_error:
+                                        logger.error(f"Failed to create snapshot even after constraint fix: {retry_error}")
                                         continue
-                        else:
-                            logger.debug(f"✅ EXISTING geometry found: composite={composite_hash[:8]}... - NO CHANGE, skipping")
-                            continue  # Skip processing - no change detected
+                                else:
+                                    logger.error(f"Error processing geometry {geometry_hash}: {snapshot_error}")
+                                    continue
+                
+                if is_baseline_run:
+                    await self._flush_baseline_snapshots(baseline_snapshots)
+                    snapshots_created = len(baseline_snapshots)
                 
                 # Check for deleted geometries (only in change detection runs, not baseline runs)
                 if not is_baseline_run:
-                    # IMPORTANT: Use the same attribute processing logic as the main loop
-                    current_hashes = set()
-                    for row in external_rows:
-                        # Build attributes dict with same logic as main loop
-                        attributes = {}
-                        for key, value in row.items():
-                            if key not in [dataset.geometry_column, 'geometry_wkb', 'geometry_hash', 'is_valid', 'geom_area']:
-                                # Convert any special types to JSON-serializable (same as main loop)
-                                if value is not None:
-                                    attributes[key] = str(value) if not isinstance(value, (str, int, float, bool)) else value
-                        
-                        attributes_hash = self.compute_attributes_hash(attributes)
-                        composite_hash = self.compute_composite_hash(row['geometry_hash'], attributes_hash)
-                        current_hashes.add(composite_hash)
-                    
                     logger.info(f"🔍 Deletion check: {len(existing_hashes)} existing vs {len(current_hashes)} current hashes")
                     
                     for existing_hash, existing_snapshot in existing_hashes.items():
@@ -535,29 +594,29 @@ class GeometryService:
         # 2. Quick size-based checks for immediate flagging
         geom_area = row.get('geom_area', 0) or 0
         geom_length = row.get('geom_length', 0) or 0
-        geom_type = row.get('geom_type', '')
+        type_id = get_geometry_type_id(row)
         
         # Zero/negative area/length - always problematic
-        if 'Polygon' in geom_type and geom_area <= 0:
-            logger.debug(f"Geometry flagged: zero/negative area polygon ({geom_area})")
+        if type_id in POLYGON_TYPE_IDS and geom_area <= 0:
+            logger.debug("Geometry flagged: zero/negative area polygon (%s)", geom_area)
             return True
         
-        if ('LineString' in geom_type or 'Line' in geom_type) and geom_length <= 0:
-            logger.debug(f"Geometry flagged: zero/negative length linestring ({geom_length})")
+        if type_id in LINE_TYPE_IDS and geom_length <= 0:
+            logger.debug("Geometry flagged: zero/negative length linestring (%s)", geom_length)
             return True
         
         # 3. Critical point count issues
         num_points = row.get('num_points', 0) or 0
-        if num_points <= 1 and 'Point' not in geom_type:
-            logger.debug(f"Geometry flagged: degenerate geometry with {num_points} points")
+        if num_points <= 1 and type_id not in POINT_TYPE_IDS:
+            logger.debug("Geometry flagged: degenerate geometry with %s points", num_points)
             return True
         
         # 4. Critical coordinate bounds issues
-        coords_to_check = [row.get('min_x'), row.get('max_x'), row.get('min_y'), row.get('max_y')]
+        coords_to_check = (row.get('min_x'), row.get('max_x'), row.get('min_y'), row.get('max_y'))
         for coord in coords_to_check:
             if coord is not None:
-                if coord != coord or coord == float('inf') or coord == float('-inf'):  # NaN or Infinity
-                    logger.debug(f"Geometry flagged: invalid coordinate ({coord})")
+                if not math.isfinite(coord):  # NaN or Infinity
+                    logger.debug("Geometry flagged: invalid coordinate (%s)", coord)
                     return True
         
         # 5. For other potential issues, use a confidence-based approach
@@ -566,7 +625,7 @@ class GeometryService:
         threshold = TestConfig.get_confidence_threshold()  # Get threshold from config
         
         if confidence >= threshold:
-            logger.debug(f"Geometry flagged: high confidence issue (confidence: {confidence})")
+            logger.debug("Geometry flagged: high confidence issue (confidence: %s)", confidence)
             return True
         
         return False  # Geometry passes critical checks
@@ -579,9 +638,6 @@ class GeometryService:
         
         Now uses externalized configuration for all thresholds.
         """
-        # Get confidence configuration
-        conf_config = TestConfig.get_test_config("confidence")
-        
         # Extract geometric properties
         is_valid = row.get('is_valid', True)
         is_simple = row.get('is_simple', True)
@@ -589,55 +645,49 @@ class GeometryService:
         geom_area = row.get('geom_area', 0) or 0
         geom_length = row.get('geom_length', 0) or 0
         num_points = row.get('num_points', 0) or 0
-        geom_type = row.get('geom_type', '')
+        type_id = get_geometry_type_id(row)
         
         # Start with base confidence
-        confidence = conf_config.get("default_confidence", 0.5)
+        confidence = cfg("confidence.default_confidence", 0.5)
         
         # Critical issues = very high confidence
         if not is_valid:
-            confidence = conf_config.get("invalid_geometry_confidence", 0.95)
+            confidence = cfg("confidence.invalid_geometry_confidence", 0.95)
         elif not is_simple:
-            confidence = conf_config.get("non_simple_geometry_confidence", 0.90)
+            confidence = cfg("confidence.non_simple_geometry_confidence", 0.90)
         elif not is_topologically_clean:
-            confidence = conf_config.get("topologically_unclean_confidence", 0.85)
+            confidence = cfg("confidence.topologically_unclean_confidence", 0.85)
         
         # Size-based issues
-        elif geom_area <= 0 and 'Polygon' in geom_type:
-            confidence = conf_config.get("zero_area_polygon_confidence", 0.90)
-        elif geom_length <= 0 and ('LineString' in geom_type or 'Line' in geom_type):
-            confidence = conf_config.get("zero_length_line_confidence", 0.90)
+        elif geom_area <= 0 and type_id in POLYGON_TYPE_IDS:
+            confidence = cfg("confidence.zero_area_polygon_confidence", 0.90)
+        elif geom_length <= 0 and type_id in LINE_TYPE_IDS:
+            confidence = cfg("confidence.zero_length_line_confidence", 0.90)
         
         # Very large geometries (use configuration thresholds)
-        elif geom_area > TestConfig.get_area_thresholds()["large_threshold"]:
-            confidence = conf_config.get("large_geometry_confidence", 0.70)
-        elif geom_length > TestConfig.get_length_thresholds()["large_threshold"]:
-            confidence = conf_config.get("large_geometry_confidence", 0.65)
+        elif geom_area > _LARGE_AREA_THRESHOLD:
+            confidence = cfg("confidence.large_geometry_confidence", 0.70)
+        elif geom_length > _LARGE_LENGTH_THRESHOLD:
+            confidence = cfg("confidence.large_geometry_confidence", 0.65)
         
         # Degenerate geometries
         elif num_points <= 1:
-            confidence = conf_config.get("degenerate_geometry_confidence", 0.95)
-        elif 'Polygon' in geom_type and num_points < TestConfig.VALIDITY_CONFIG["min_polygon_points"]:
-            confidence = conf_config.get("insufficient_points_confidence", 0.90)
-        elif ('LineString' in geom_type or 'Line' in geom_type) and num_points < TestConfig.VALIDITY_CONFIG["min_linestring_points"]:
-            confidence = conf_config.get("insufficient_points_confidence", 0.85)
+            confidence = cfg("confidence.degenerate_geometry_confidence", 0.95)
+        elif type_id in POLYGON_TYPE_IDS and num_points < _MIN_POLYGON_POINTS:
+            confidence = cfg("confidence.insufficient_points_confidence", 0.90)
+        elif type_id in LINE_TYPE_IDS and num_points < _MIN_LINESTRING_POINTS:
+            confidence = cfg("confidence.insufficient_points_confidence", 0.85)
         
         # Coordinate bounds issues
-        coords_to_check = [row.get('min_x'), row.get('max_x'), row.get('min_y'), row.get('max_y')]
+        coords_to_check = (row.get('min_x'), row.get('max_x'), row.get('min_y'), row.get('max_y'))
         for coord in coords_to_check:
             if coord is not None:
-                if abs(coord) > TestConfig.get_coordinate_bounds():
-                    confidence = max(confidence, conf_config.get("suspicious_coordinates_confidence", 0.75))
+                if abs(coord) > _MAX_COORDINATE_MAGNITUDE:
+                    confidence = max(confidence, cfg("confidence.suspicious_coordinates_confidence", 0.75))
         
         # Adjust confidence based on geometry complexity
         # More complex geometries might have legitimate edge cases
-        complex_threshold = conf_config.get("complex_geometry_point_threshold", 100)
-        very_complex_threshold = conf_config.get("very_complex_geometry_point_threshold", 1000)
-        
-        if num_points > very_complex_threshold:
-            confidence *= conf_config.get("very_complex_geometry_confidence_reduction", 0.8)
-        elif num_points > complex_threshold:
-            confidence *= conf_config.get("complex_geometry_confidence_reduction", 0.9)
+        confidence *= TestConfig.confidence_reduction_for(num_points)
         
         # Ensure confidence stays within bounds
         return max(0.0, min(1.0, confidence))
@@ -648,6 +698,8 @@ class GeometryService:
         This runs on a different timer (hourly) and populates SpatialCheck table.
         """
         start_time = datetime.now(timezone.utc)
+        # Rolling back on error expires the dataset; keep what the error path needs
+        dataset_id = dataset.id
         
         try:
             # Clear existing spatial checks for this dataset before running new ones
@@ -670,7 +722,7 @@ class GeometryService:
                 quality_query = f"""
                     SELECT 
                         *,
-                        ST_AsBinary({dataset.geometry_column}) as geometry_wkb,
+                        {_geometry_hash_sql(dataset.geometry_column)} as geometry_hash,
                         ST_IsValid({dataset.geometry_column}) as is_valid,
                         ST_IsValidReason({dataset.geometry_column}) as validity_reason,
                         ST_IsSimple({dataset.geometry_column}) as is_simple,
@@ -678,6 +730,7 @@ class GeometryService:
                         ST_Length({dataset.geometry_column}) as geom_length,
                         ST_NPoints({dataset.geometry_column}) as num_points,
                         ST_GeometryType({dataset.geometry_column}) as geom_type,
+                        {GEOMETRY_TYPE_ID_SQL.format(column=dataset.geometry_column)} as geom_type_id,
                         -- Ring orientation check (for polygons)
                         CASE 
                             WHEN ST_GeometryType({dataset.geometry_column}) LIKE '%Polygon%' 
@@ -710,18 +763,32 @@ class GeometryService:
                     "failed_checks": 0
                 }
                 
+                # One runner for the whole dataset so unit scale and thresholds
+                # are resolved once rather than per geometry
+                test_runner = SpatialTestRunner(self.db)
+                
+                # Load the dataset's snapshots in one query and index them by geometry
+                # hash, instead of one lookup query per source row. The checks only
+                # read these columns, so the geometries and attributes stay behind.
+                result = await self.db.execute(
+                    select(GeometrySnapshot)
+                    .options(load_only(
+                        GeometrySnapshot.id,
+                        GeometrySnapshot.geometry_hash,
+                        GeometrySnapshot.composite_hash,
+                    ))
+                    .where(GeometrySnapshot.dataset_id == dataset.id)
+                )
+                snapshots_by_geometry_hash: Dict[str, List[GeometrySnapshot]] = {}
+                for dataset_snapshot in result.scalars():
+                    snapshots_by_geometry_hash.setdefault(dataset_snapshot.geometry_hash, []).append(dataset_snapshot)
+                
                 for i, row in enumerate(external_rows):
                     # Get or create snapshot for this geometry
-                    geometry_hash = hashlib.md5(row['geometry_wkb']).hexdigest()
+                    geometry_hash = row['geometry_hash']
                     
                     # Find corresponding snapshot (handle duplicates)
-                    result = await self.db.execute(
-                        select(GeometrySnapshot).where(
-                            GeometrySnapshot.dataset_id == dataset.id,
-                            GeometrySnapshot.geometry_hash == geometry_hash
-                        )
-                    )
-                    snapshots = result.scalars().all()
+                    snapshots = snapshots_by_geometry_hash.get(geometry_hash, [])
                     snapshot = snapshots[0] if snapshots else None
                     
                     if len(snapshots) > 1:
@@ -731,7 +798,7 @@ class GeometryService:
                         continue  # Skip if no snapshot exists
                     
                     # Run basic quality checks
-                    checks = await self._run_basic_quality_checks(dataset.id, snapshot, row)
+                    checks = await test_runner.run_all_tests(dataset.id, snapshot, row)
                     
                     for check in checks:
                         self.db.add(check)
@@ -759,19 +826,11 @@ class GeometryService:
                 await external_conn.close()
             
         except Exception as e:
-            logger.error(f"Error running quality checks for dataset {dataset.id}: {e}")
+            # Roll back so the cleared spatial checks come back and the session stays usable
+            await self.db.rollback()
+            logger.error(f"Error running quality checks for dataset {dataset_id}: {e}")
             return {"error": str(e)}
     
-    async def _run_basic_quality_checks(
-        self, 
-        dataset_id: UUID, 
-        snapshot: GeometrySnapshot, 
-        row: dict
-    ) -> List[SpatialCheck]:
-        """Run basic quality checks using the dedicated spatial tests module."""
-        from .spatial_tests import run_basic_quality_checks
-        return await run_basic_quality_checks(self.db, dataset_id, snapshot, row)
-
     # Keep existing methods for backward compatibility
     async def import_geometries_from_external_source(
         self, 
@@ -782,9 +841,20 @@ class GeometryService:
         return await self.monitor_dataset_changes(dataset, force_reimport)
     
     async def _get_existing_snapshots(self, dataset_id: UUID) -> List[GeometrySnapshot]:
-        """Get all existing snapshots for a dataset."""
+        """
+        Get all existing snapshots for a dataset, loading only their ids and hashes.
+        Change detection never reads the stored geometry or attributes, and for a
+        large dataset those dominate the memory of the snapshot list.
+        """
         result = await self.db.execute(
-            select(GeometrySnapshot).where(GeometrySnapshot.dataset_id == dataset_id)
+            select(GeometrySnapshot)
+            .options(load_only(
+                GeometrySnapshot.id,
+                GeometrySnapshot.geometry_hash,
+                GeometrySnapshot.attributes_hash,
+                GeometrySnapshot.composite_hash,
+            ))
+            .where(GeometrySnapshot.dataset_id == dataset_id)
         )
         return result.scalars().all()
     
@@ -792,17 +862,17 @@ class GeometryService:
         self, 
         geometry_hash: str, 
         attributes_hash: str, 
-        existing_snapshots: List[GeometrySnapshot]
+        existing_by_geometry_hash: Dict[str, GeometrySnapshot]
     ) -> str:
         """Determine the type of diff based on hash comparison."""
         
         # Check if geometry exists with different attributes
-        for snapshot in existing_snapshots:
-            if snapshot.geometry_hash == geometry_hash:
-                if snapshot.attributes_hash != attributes_hash:
-                    return "UPDATED"  # Same geometry, different attributes
-                else:
-                    return "DUPLICATE"  # Exact match (shouldn't happen due to composite hash check)
+        snapshot = existing_by_geometry_hash.get(geometry_hash)
+        if snapshot is not None:
+            if snapshot.attributes_hash != attributes_hash:
+                return "UPDATED"  # Same geometry, different attributes
+            else:
+                return "DUPLICATE"  # Exact match (shouldn't happen due to composite hash check)
         
         # New geometry
         return "NEW"
@@ -886,8 +956,7 @@ class GeometryService:
             geojson_text = result.scalar()
             
             if geojson_text:
-                import json
-                geojson_data = json.loads(geojson_text)
+                geojson_data = orjson.loads(geojson_text)
                 logger.info(f"Successfully converted geometry for snapshot {snapshot_id} to GeoJSON: {geojson_data['type']}")
                 return geojson_data
             else:
@@ -926,10 +995,9 @@ class GeometryService:
             
             row = result.fetchone()
             if row:
-                import json
                 return {
-                    "added_area": json.loads(row.added_area) if row.added_area else None,
-                    "removed_area": json.loads(row.removed_area) if row.removed_area else None,
+                    "added_area": orjson.loads(row.added_area) if row.added_area else None,
+                    "removed_area": orjson.loads(row.removed_area) if row.removed_area else None,
                     "added_area_size": float(row.added_area_size) if row.added_area_size else 0.0,
                     "removed_area_size": float(row.removed_area_size) if row.removed_area_size else 0.0
                 }
@@ -940,6 +1008,25 @@ class GeometryService:
             logger.error(f"Error calculating geometry difference: {e}")
             return None
     
+    async def _flush_baseline_snapshots(self, snapshots: List[GeometrySnapshot]) -> None:
+        """
+        Flush pending baseline snapshots as one batch.
+        On a PostGIS dimension constraint violation, relax the constraints and re-add every
+        snapshot from this run, since the rollback also discards the batches flushed before it.
+        """
+        try:
+            await self.db.flush()
+        except Exception as flush_error:
+            error_str = str(flush_error)
+            if "enforce_dims_geometry" not in error_str and "violates check constraint" not in error_str:
+                raise
+            logger.warning(f"🔧 Detected PostGIS dimension constraint violation - auto-fixing...")
+            await self.db.rollback()
+            await self._ensure_mixed_dimension_support()
+            self.db.add_all(snapshots)
+            await self.db.flush()
+            logger.info(f"✅ Successfully created {len(snapshots)} baseline snapshots after constraint fix")
+    
     async def _ensure_mixed_dimension_support(self):
         """
         Automatically detect and fix PostGIS dimension constraints to support mixed dimensions.
@@ -19,10 +19,45 @@ from sqlalchemy import select, func, text
 import logging
 
 from database import SpatialCheck, GeometrySnapshot
-from .test_config import TestConfig
+from .test_config import TestConfig, is_test_enabled, should_fail_on_invalid
 
 logger = logging.getLogger("dbfriend-cloud.spatial-tests")
 
+# OGC geometry type codes, as returned in the `geom_type_id` query column
+GEOMETRY_TYPE_IDS = {
+    "ST_Point": 1,
+    "ST_LineString": 2,
+    "ST_Polygon": 3,
+    "ST_MultiPoint": 4,
+    "ST_MultiLineString": 5,
+    "ST_MultiPolygon": 6,
+    "ST_GeometryCollection": 7,
+    # Curved and surface types (SQL/MM codes)
+    "ST_CircularString": 8,
+    "ST_CompoundCurve": 9,
+    "ST_CurvePolygon": 10,
+    "ST_MultiCurve": 11,
+    "ST_MultiSurface": 12,
+    "ST_Triangle": 17,
+}
+POINT_TYPE_IDS = frozenset({1, 4})
+# Curves and surfaces get the same length/area checks as their linear counterparts
+LINE_TYPE_IDS = frozenset({2, 5, 8, 9, 11})
+POLYGON_TYPE_IDS = frozenset({3, 6, 10, 12, 17})
+
+# SQL expression producing `geom_type_id` for a geometry column
+GEOMETRY_TYPE_ID_SQL = "CASE ST_GeometryType({column}) " + " ".join(
+    f"WHEN '{name}' THEN {type_id}" for name, type_id in GEOMETRY_TYPE_IDS.items()
+) + " ELSE 0 END"
+
+
+def get_geometry_type_id(row) -> int:
+    """Get the OGC type code for a row, falling back to the type name if not queried."""
+    type_id = row.get('geom_type_id')
+    if type_id is None:
+        type_id = GEOMETRY_TYPE_IDS.get(row.get('geom_type', ''), 0)
+    return type_id
+
 
 class SpatialTestRunner:
     """Main test runner that coordinates all spatial quality checks."""
@@ -33,6 +68,23 @@ class SpatialTestRunner:
         self.topology_tester = TopologyTests(db)
         self.area_tester = AreaTests(db)
         self.duplicate_tester = DuplicateTests(db)
+        
+        # Unit scale and derived thresholds are constant for a dataset, so they
+        # are resolved once and reused across every snapshot in the run
+        self._scale_dataset_id: Optional[UUID] = None
+        self._unit_scale: Optional[float] = None
+        self._area_thresholds: Optional[Dict[str, float]] = None
+        self._length_thresholds: Optional[Dict[str, float]] = None
+    
+    def _resolve_thresholds(self, dataset_id: UUID) -> None:
+        """Compute unit scale and size thresholds once per dataset."""
+        if self._unit_scale is not None and self._scale_dataset_id == dataset_id:
+            return
+        
+        self._scale_dataset_id = dataset_id
+        self._unit_scale = TestConfig.get_unit_scale(str(dataset_id))
+        self._area_thresholds = TestConfig.get_area_thresholds(self._unit_scale)
+        self._length_thresholds = TestConfig.get_length_thresholds(self._unit_scale)
     
     async def run_all_tests(
         self, 
@@ -44,56 +96,50 @@ class SpatialTestRunner:
         all_checks = []
         
         # Run basic tests based on configuration
-        if TestConfig.is_test_enabled("validity"):
+        if is_test_enabled("validity"):
             all_checks.extend(await self.validity_tester.run_tests(dataset_id, snapshot, external_row))
         
-        if TestConfig.is_test_enabled("topology"):
+        if is_test_enabled("topology"):
             all_checks.extend(await self.topology_tester.run_tests(dataset_id, snapshot, external_row))
         
-        if TestConfig.is_test_enabled("area"):
-            all_checks.extend(await self.area_tester.run_tests(dataset_id, snapshot, external_row))
+        if is_test_enabled("area"):
+            self._resolve_thresholds(dataset_id)
+            all_checks.extend(await self.area_tester.run_tests(
+                dataset_id, snapshot, external_row,
+                area_thresholds=self._area_thresholds,
+                length_thresholds=self._length_thresholds
+            ))
         
-        if TestConfig.is_test_enabled("duplicate"):
+        if is_test_enabled("duplicate"):
             all_checks.extend(await self.duplicate_tester.run_tests(dataset_id, snapshot, external_row))
         
         # Add geometry-type specific tests if enabled
-        if TestConfig.is_test_enabled("geometry_specific"):
-            geom_type = self._get_geometry_type(external_row)
-            if geom_type:
+        if is_test_enabled("geometry_specific"):
+            type_id = get_geometry_type_id(external_row)
+            if type_id:
                 type_specific_tests = await self._run_geometry_type_tests(
-                    dataset_id, snapshot, external_row, geom_type
+                    dataset_id, snapshot, external_row, type_id
                 )
                 all_checks.extend(type_specific_tests)
         
         return all_checks
     
-    def _get_geometry_type(self, external_row: dict) -> Optional[str]:
-        """Extract geometry type from external row data."""
-        # Get geometry type from PostGIS ST_GeometryType function
-        geom_type = external_row.get('geom_type', '')
-        
-        if geom_type:
-            # Remove ST_ prefix if present (PostGIS returns "ST_Polygon", we want "POLYGON")
-            clean_type = geom_type.upper().replace('ST_', '')
-            return clean_type
-        
-        return None
-    
     async def _run_geometry_type_tests(
         self, 
         dataset_id: UUID, 
         snapshot: GeometrySnapshot, 
         external_row: dict, 
-        geom_type: str
+        type_id: int
     ) -> List[SpatialCheck]:
         """Run tests specific to geometry type (Point, LineString, Polygon, etc.)."""
         checks = []
         
-        if geom_type.upper() == 'POLYGON':
+        # Only single-part types have dedicated tests
+        if type_id == GEOMETRY_TYPE_IDS["ST_Polygon"]:
             checks.extend(await PolygonTests(self.db).run_tests(dataset_id, snapshot, external_row))
-        elif geom_type.upper() == 'LINESTRING':
+        elif type_id == GEOMETRY_TYPE_IDS["ST_LineString"]:
             checks.extend(await LineStringTests(self.db).run_tests(dataset_id, snapshot, external_row))
-        elif geom_type.upper() == 'POINT':
+        elif type_id == GEOMETRY_TYPE_IDS["ST_Point"]:
             checks.extend(await PointTests(self.db).run_tests(dataset_id, snapshot, external_row))
         
         return checks
@@ -173,13 +219,11 @@ class ValidityTests(BaseTestCategory):
         external_row: dict
     ) -> SpatialCheck:
         """Check basic OGC validity with detailed PostGIS reason."""
-        from .test_config import TestConfig
-        
         is_valid = external_row.get('is_valid', True)
         validity_reason = external_row.get('validity_reason', 'Valid Geometry')
         
         # Get configuration
-        fail_on_invalid = TestConfig.should_fail_on_invalid()
+        fail_on_invalid = should_fail_on_invalid()
         result_level = "PASS" if is_valid else ("FAIL" if fail_on_invalid else "WARNING")
         
         return self._create_check(
@@ -256,6 +300,7 @@ class ValidityTests(BaseTestCategory):
         
         num_points = external_row.get('num_points', 0)
         geom_type = external_row.get('geom_type', '')
+        type_id = get_geometry_type_id(external_row)
         
         # Get configuration thresholds
         validity_config = TestConfig.get_test_config("validity")
@@ -269,15 +314,15 @@ class ValidityTests(BaseTestCategory):
         # Check minimum point requirements
         if num_points <= 0:
             issues.append("Zero points")
-        elif 'Polygon' in geom_type and num_points < min_polygon_points:
+        elif type_id in POLYGON_TYPE_IDS and num_points < min_polygon_points:
             issues.append(f"Polygon has only {num_points} points (minimum {min_polygon_points} required)")
-        elif ('LineString' in geom_type or 'Line' in geom_type) and num_points < min_linestring_points:
+        elif type_id in LINE_TYPE_IDS and num_points < min_linestring_points:
             issues.append(f"LineString has only {num_points} points (minimum {min_linestring_points} required)")
-        elif 'Point' in geom_type and (num_points < min_point_points or num_points > max_point_points):
+        elif type_id in POINT_TYPE_IDS and (num_points < min_point_points or num_points > max_point_points):
             issues.append(f"Point geometry has {num_points} points (should be exactly {min_point_points})")
         
         # Check for degenerate geometries
-        if num_points == 1 and 'Point' not in geom_type:
+        if num_points == 1 and type_id not in POINT_TYPE_IDS:
             issues.append(f"Non-point geometry has only 1 point")
         
         if issues:
@@ -465,7 +510,7 @@ class TopologyTests(BaseTestCategory):
         is_ccw_oriented = external_row.get('is_ccw_oriented')
         
         # Only check orientation for polygon geometries
-        if 'Polygon' not in geom_type:
+        if get_geometry_type_id(external_row) not in POLYGON_TYPE_IDS:
             return None
         
         if is_ccw_oriented is None:
@@ -508,6 +553,7 @@ class TopologyTests(BaseTestCategory):
         """
         geom_type = external_row.get('geom_type', '')
         num_points = external_row.get('num_points', 0)
+        type_id = get_geometry_type_id(external_row)
         
         issues = []
         
@@ -516,7 +562,7 @@ class TopologyTests(BaseTestCategory):
             issues.append(f"Very complex geometry with {num_points} points (potential performance issue)")
         
         # For polygons: check for potential ring issues
-        if 'Polygon' in geom_type:
+        if type_id in POLYGON_TYPE_IDS:
             # Future: We could add queries to check:
             # - Holes that touch the exterior ring
             # - Holes that extend outside the exterior ring
@@ -524,7 +570,7 @@ class TopologyTests(BaseTestCategory):
             pass
         
         # For linestrings: check for potential issues
-        if 'LineString' in geom_type or 'Line' in geom_type:
+        if type_id in LINE_TYPE_IDS:
             # Future: We could add queries to check:
             # - Consecutive duplicate points (spikes)
             # - Nearly collinear points that could be simplified
@@ -563,11 +609,19 @@ class AreaTests(BaseTestCategory):
         self, 
         dataset_id: UUID, 
         snapshot: GeometrySnapshot, 
-        external_row: dict
+        external_row: dict,
+        area_thresholds: Optional[Dict[str, float]] = None,
+        length_thresholds: Optional[Dict[str, float]] = None
     ) -> List[SpatialCheck]:
         """Run comprehensive area and size validation tests."""
         checks = []
         
+        # Fall back to unscaled thresholds when the caller hasn't resolved them
+        if area_thresholds is None:
+            area_thresholds = TestConfig.get_area_thresholds()
+        if length_thresholds is None:
+            length_thresholds = TestConfig.get_length_thresholds()
+        
         # Get geometry properties
         geom_area = external_row.get('geom_area', 0) or 0
         geom_length = external_row.get('geom_length', 0) or 0
@@ -576,14 +630,14 @@ class AreaTests(BaseTestCategory):
         
         # 1. Area validation for area-based geometries
         area_check = await self._check_area_validation(
-            dataset_id, snapshot, external_row, geom_area, geom_type
+            dataset_id, snapshot, external_row, geom_area, geom_type, area_thresholds
         )
         if area_check:
             checks.append(area_check)
         
         # 2. Length validation for linear geometries
         length_check = await self._check_length_validation(
-            dataset_id, snapshot, external_row, geom_length, geom_type
+            dataset_id, snapshot, external_row, geom_length, geom_type, length_thresholds
         )
         if length_check:
             checks.append(length_check)
@@ -610,16 +664,20 @@ class AreaTests(BaseTestCategory):
         snapshot: GeometrySnapshot, 
         external_row: dict,
         geom_area: float,
-        geom_type: str
+        geom_type: str,
+        thresholds: Dict[str, float]
     ) -> Optional[SpatialCheck]:
         """Validate area for area-based geometries (polygons)."""
         
         # Only check area for polygon geometries
-        if 'Polygon' not in geom_type:
+        if get_geometry_type_id(external_row) not in POLYGON_TYPE_IDS:
             return None
         
+        small_threshold = thresholds["small_threshold"]
+        large_threshold = thresholds["large_threshold"]
+        
         # Critical area issues
-        if geom_area <= 0:
+        if geom_area <= thresholds["zero_threshold"]:
             return self._create_check(
                 dataset_id=dataset_id,
                 snapshot_id=snapshot.id,
@@ -630,25 +688,25 @@ class AreaTests(BaseTestCategory):
             )
         
         # Very small areas (might be digitization errors)
-        if 0 < geom_area < 0.001:  # Adjust threshold based on your coordinate system
+        if geom_area < small_threshold:  # Scaled to the dataset's coordinate units
             return self._create_check(
                 dataset_id=dataset_id,
                 snapshot_id=snapshot.id,
                 check_type="AREA",
                 check_result="WARNING",
                 error_message=f"Polygon has very small area: {geom_area} (possible digitization error)",
-                error_details={"area": geom_area, "threshold": 0.001}
+                error_details={"area": geom_area, "threshold": small_threshold}
             )
         
         # Very large areas (might be coordinate system errors)
-        if geom_area > 1000000:  # 1M square units - adjust based on coordinate system
+        if geom_area > large_threshold:
             return self._create_check(
                 dataset_id=dataset_id,
                 snapshot_id=snapshot.id,
                 check_type="AREA",
                 check_result="WARNING",
                 error_message=f"Polygon has unusually large area: {geom_area} (possible coordinate error)",
-                error_details={"area": geom_area, "threshold": 1000000}
+                error_details={"area": geom_area, "threshold": large_threshold}
             )
         
         return None
@@ -659,14 +717,18 @@ class AreaTests(BaseTestCategory):
         snapshot: GeometrySnapshot, 
         external_row: dict,
         geom_length: float,
-        geom_type: str
+        geom_type: str,
+        thresholds: Dict[str, float]
     ) -> Optional[SpatialCheck]:
         """Validate length for linear geometries."""
         
         # Check length for linear geometries
-        if 'LineString' in geom_type or 'Line' in geom_type:
+        if get_geometry_type_id(external_row) in LINE_TYPE_IDS:
+            small_threshold = thresholds["small_threshold"]
+            large_threshold = thresholds["large_threshold"]
+            
             # Zero length lines are always problematic
-            if geom_length <= 0:
+            if geom_length <= thresholds["zero_threshold"]:
                 return self._create_check(
                     dataset_id=dataset_id,
                     snapshot_id=snapshot.id,
@@ -677,25 +739,25 @@ class AreaTests(BaseTestCategory):
                 )
             
             # Very short lines (might be digitization errors)
-            if 0 < geom_length < 0.01:  # Adjust threshold based on coordinate system
+            if geom_length < small_threshold:  # Scaled to the dataset's coordinate units
                 return self._create_check(
                     dataset_id=dataset_id,
                     snapshot_id=snapshot.id,
                     check_type="AREA",
                     check_result="WARNING",
                     error_message=f"LineString has very short length: {geom_length} (possible digitization error)",
-                    error_details={"length": geom_length, "threshold": 0.01}
+                    error_details={"length": geom_length, "threshold": small_threshold}
                 )
             
             # Very long lines (might be coordinate system errors)
-            if geom_length > 10000000:  # 10M linear units
+            if geom_length > large_threshold:
                 return self._create_check(
                     dataset_id=dataset_id,
                     snapshot_id=snapshot.id,
                     check_type="AREA",
                     check_result="WARNING",
                     error_message=f"LineString has unusually long length: {geom_length} (possible coordinate error)",
-                    error_details={"length": geom_length, "threshold": 10000000}
+                    error_details={"length": geom_length, "threshold": large_threshold}
                 )
         
         return None
@@ -712,7 +774,7 @@ class AreaTests(BaseTestCategory):
         """Check size ratios that might indicate geometric problems."""
         
         # For polygons: check area-to-perimeter ratio
-        if 'Polygon' in geom_type and geom_area > 0 and geom_length > 0:
+        if get_geometry_type_id(external_row) in POLYGON_TYPE_IDS and geom_area > 0 and geom_length > 0:
             # Calculate compactness (area vs perimeter)
             # For a circle: area/perimeter² = 1/(4π) ≈ 0.0796
             # For a square: area/perimeter² = 1/16 = 0.0625
@@ -752,10 +814,11 @@ class AreaTests(BaseTestCategory):
         if num_points <= 0:
             return None
         
+        type_id = get_geometry_type_id(external_row)
         issues = []
         
         # For polygons: check points-to-area ratio
-        if 'Polygon' in geom_type and geom_area > 0:
+        if type_id in POLYGON_TYPE_IDS and geom_area > 0:
             points_per_area = num_points / geom_area
             
             # Too many points for small areas (over-digitization)
@@ -767,7 +830,7 @@ class AreaTests(BaseTestCategory):
                 issues.append(f"Low point density: {points_per_area:.6f} points per unit area (possible under-digitization)")
         
         # For linestrings: check points-to-length ratio
-        if ('LineString' in geom_type or 'Line' in geom_type) and geom_length > 0:
+        if type_id in LINE_TYPE_IDS and geom_length > 0:
             points_per_length = num_points / geom_length
             
             # Too many points for short lines
@@ -808,6 +871,12 @@ class DuplicateTests(BaseTestCategory):
     - Spatial clustering for duplicate groups
     """
     
+    def __init__(self, db: AsyncSession):
+        super().__init__(db)
+        # Near-duplicate counts per snapshot, computed in bulk once per dataset
+        self._near_duplicate_dataset_id: Optional[UUID] = None
+        self._near_duplicate_counts: Dict[UUID, int] = {}
+    
     async def run_tests(
         self, 
         dataset_id: UUID, 
@@ -903,30 +972,13 @@ class DuplicateTests(BaseTestCategory):
         This implements spatial comparison for geometries that might be
         equivalent but have different vertex orders or minor variations.
         """
-        # Use PostGIS ST_Equals to find spatially equivalent geometries
-        # ST_Equals returns true if geometries are spatially equal (same shape)
-        # even if they have different vertex orders or representations
+        if self._near_duplicate_dataset_id != dataset_id:
+            self._near_duplicate_counts = await self._find_near_duplicate_groups(dataset_id)
+            self._near_duplicate_dataset_id = dataset_id
         
-        near_duplicate_result = await self.db.execute(
-            text("""
-                SELECT COUNT(*) as near_count
-                FROM geometry_snapshots gs
-                WHERE gs.dataset_id = :dataset_id 
-                AND gs.id != :snapshot_id
-                AND gs.geometry_hash != :geometry_hash  -- Exclude exact duplicates
-                AND ST_Equals(gs.geometry, 
-                    (SELECT geometry FROM geometry_snapshots WHERE id = :snapshot_id)
-                )
-            """),
-            {
-                "dataset_id": dataset_id,
-                "snapshot_id": snapshot.id,
-                "geometry_hash": snapshot.geometry_hash
-            }
-        )
-        near_count = near_duplicate_result.scalar()
+        near_count = self._near_duplicate_counts.get(snapshot.id, 0)
         
-        if near_count and near_count > 0:
+        if near_count > 0:
             return self._create_check(
                 dataset_id=dataset_id,
                 snapshot_id=snapshot.id,
@@ -942,6 +994,47 @@ class DuplicateTests(BaseTestCategory):
         
         return None
     
+    async def _find_near_duplicate_groups(self, dataset_id: UUID) -> Dict[UUID, int]:
+        """
+        Find all near-duplicates in a dataset with a single bucketed query.
+        
+        Geometries that pass ST_Equals are built from the same point set, so they
+        share an identical envelope. Hashing the envelope gives a cheap bucket
+        signature; ST_Equals then only runs pairwise inside buckets that hold
+        more than one distinct geometry hash, instead of once per snapshot
+        against the whole dataset.
+        """
+        result = await self.db.execute(
+            text("""
+                WITH signed AS (
+                    SELECT id, geometry, geometry_hash,
+                           MD5(ST_AsBinary(ST_Envelope(geometry))) AS sig
+                    FROM geometry_snapshots
+                    WHERE dataset_id = :dataset_id
+                    AND geometry IS NOT NULL
+                ),
+                buckets AS (
+                    SELECT sig
+                    FROM signed
+                    GROUP BY sig
+                    HAVING COUNT(DISTINCT geometry_hash) > 1
+                ),
+                candidates AS (
+                    SELECT s.* FROM signed s JOIN buckets b ON s.sig = b.sig
+                )
+                SELECT a.id, COUNT(*) AS near_count
+                FROM candidates a
+                JOIN candidates b
+                  ON a.sig = b.sig
+                 AND a.id != b.id
+                 AND a.geometry_hash != b.geometry_hash  -- Exclude exact duplicates
+                 AND ST_Equals(a.geometry, b.geometry)
+                GROUP BY a.id
+            """),
+            {"dataset_id": dataset_id}
+        )
+        return {row.id: row.near_count for row in result.fetchall()}
+    
     async def _check_composite_duplicates(
         self, 
         dataset_id: UUID, 
@@ -954,18 +1047,37 @@ class DuplicateTests(BaseTestCategory):
         This checks the composite hash which combines geometry and attributes,
         implementing the comprehensive duplicate detection approach.
         """
-        # Check for duplicate composite hashes (geometry + attributes)
+        # Capped count of duplicate composite hashes (geometry + attributes).
+        # The LIMIT stops the index scan early, so runaway duplicate buckets
+        # don't cost a full traversal just to report a number; one row past
+        # the cap tells an exact count of max_count apart from a capped one.
+        max_count = TestConfig.get_test_config("duplicate").get("max_duplicate_count", 1000)
         composite_duplicate_result = await self.db.execute(
-            select(func.count(GeometrySnapshot.id))
-            .where(
-                GeometrySnapshot.dataset_id == dataset_id,
-                GeometrySnapshot.composite_hash == snapshot.composite_hash,
-                GeometrySnapshot.id != snapshot.id
-            )
+            text("""
+                SELECT COUNT(*) FROM (
+                    SELECT 1
+                    FROM geometry_snapshots
+                    WHERE dataset_id = :dataset_id
+                    AND composite_hash = :composite_hash
+                    AND id != :snapshot_id
+                    LIMIT :max_count
+                ) capped
+            """),
+            {
+                "dataset_id": dataset_id,
+                "composite_hash": snapshot.composite_hash,
+                "snapshot_id": snapshot.id,
+                "max_count": max_count + 1
+            }
         )
         composite_count = composite_duplicate_result.scalar()
+        count_capped = composite_count > max_count
+        if count_capped:
+            composite_count = max_count
         
         if composite_count > 0:
+            count_label = f"{composite_count}+" if count_capped else str(composite_count)
+            
             # This is more serious than just geometry duplicates - 
             # it means the entire feature (geometry + attributes) is duplicated
             return self._create_check(
@@ -973,9 +1085,10 @@ class DuplicateTests(BaseTestCategory):
                 snapshot_id=snapshot.id,
                 check_type="DUPLICATE",
                 check_result="FAIL",  # More serious than geometry-only duplicates
-                error_message=f"Found {composite_count} complete duplicate features (geometry + attributes)",
+                error_message=f"Found {count_label} complete duplicate features (geometry + attributes)",
                 error_details={
                     "composite_duplicate_count": composite_count,
+                    "count_capped": count_capped,
                     "composite_hash": snapshot.composite_hash,
                     "note": "Both geometry and attributes are identical - this is likely a data import error"
                 }
@@ -1071,40 +1184,41 @@ class PolygonTests(BaseTestCategory):
         geom_length = external_row.get('geom_length', 0) or 0  # This is perimeter for polygons
         num_points = external_row.get('num_points', 0) or 0
         
-        issues = []
+        compactness = geom_area / (geom_length * geom_length) if geom_area > 0 and geom_length > 0 else float('inf')
+        points_per_area = num_points / geom_area if geom_area > 0 else 0.0
         
-        # Check for very narrow polygons (low area-to-perimeter ratio)
-        if geom_area > 0 and geom_length > 0:
-            compactness = geom_area / (geom_length * geom_length)
-            if compactness < 0.0001:  # Very narrow polygon
-                issues.append(f"Very narrow polygon (compactness: {compactness:.6f})")
+        # Very narrow polygon (low area-to-perimeter ratio)
+        is_narrow = compactness < 0.0001
+        # Potentially over-complex polygon: many points for a small area
+        is_dense = points_per_area > 1000
+        # Suspiciously simple polygon for a large area
+        is_oversimplified = geom_area > 10000 and num_points < 10
         
-        # Check for potentially over-complex polygons
-        if geom_area > 0 and num_points > 0:
-            points_per_area = num_points / geom_area
-            if points_per_area > 1000:  # Many points for small area
-                issues.append(f"Very high vertex density: {points_per_area:.1f} points per unit area")
+        # Fast path: most polygons are clean, so skip building messages
+        if not (is_narrow or is_dense or is_oversimplified):
+            return None
         
-        # Check for suspiciously simple polygons for large areas
-        if geom_area > 10000 and num_points < 10:
+        issues = []
+        if is_narrow:
+            issues.append(f"Very narrow polygon (compactness: {compactness:.6f})")
+        if is_dense:
+            issues.append(f"Very high vertex density: {points_per_area:.1f} points per unit area")
+        if is_oversimplified:
             issues.append(f"Very simple polygon for large area: only {num_points} points for area {geom_area}")
         
-        if issues:
-            return self._create_check(
-                dataset_id=dataset_id,
-                snapshot_id=snapshot.id,
-                check_type="POLYGON",
-                check_result="WARNING",
-                error_message=f"Polygon shape concerns: {', '.join(issues)}",
-                error_details={
-                    "shape_issues": issues,
-                    "area": geom_area,
-                    "perimeter": geom_length,
-                    "num_points": num_points
-                }
-            )
-        
-        return None
+        return self._create_check(
+            dataset_id=dataset_id,
+            snapshot_id=snapshot.id,
+            check_type="POLYGON",
+            check_result="WARNING",
+            error_message=f"Polygon shape concerns: {', '.join(issues)}",
+            error_details={
+                "shape_issues": issues,
+                "area": geom_area,
+                "perimeter": geom_length,
+                "num_points": num_points
+            }
+        )
     
     async def _check_hole_validation(
         self, 
@@ -1169,20 +1283,6 @@ class PointTests(BaseTestCategory):
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-async def run_basic_quality_checks(
-    db: AsyncSession,
-    dataset_id: UUID, 
-    snapshot: GeometrySnapshot, 
-    external_row: dict
-) -> List[SpatialCheck]:
-    """
-    Convenience function to run all basic quality checks.
-    This replaces the old _run_basic_quality_checks method in GeometryService.
-    """
-    test_runner = SpatialTestRunner(db)
-    return await test_runner.run_all_tests(dataset_id, snapshot, external_row)
-
-
 def get_available_test_types() -> List[str]:
     """Get list of all available test types."""
     return [
@@ -5,6 +5,8 @@ This file contains configuration for all spatial quality tests.
 Easy to modify test behavior, enable/disable tests, and set thresholds.
 """
 
+from bisect import bisect_left
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 
 
@@ -101,6 +103,7 @@ class TestConfig:
         "composite_duplicate_result": "FAIL",  # More serious - likely import error
         # Performance settings
         "max_duplicate_samples_in_details": 5,  # Limit result set size
+        "max_duplicate_count": 1000,  # Stop counting duplicates past this (reported as "1000+")
         "enable_spatial_duplicate_search": True,  # Can disable for performance
     }
     
@@ -190,6 +193,11 @@ class TestConfig:
         "max_concurrent_dataset_tasks": 5,  # Limit concurrent processing
     }
     
+    # Lookup tables built once below the class body
+    _CONFIG_MAP: Dict[str, Dict[str, Any]] = {}
+    _DEFAULT_AREA_THRESHOLDS: Optional[Dict[str, float]] = None
+    _DEFAULT_LENGTH_THRESHOLDS: Optional[Dict[str, float]] = None
+    
     # ============================================================================
     # CONVENIENCE METHODS
     # ============================================================================
@@ -197,27 +205,18 @@ class TestConfig:
     @classmethod
     def is_test_enabled(cls, test_category: str) -> bool:
         """Check if a test category is enabled."""
-        return cls.ENABLED_TEST_CATEGORIES.get(test_category, False)
+        return is_test_enabled(test_category)
     
     @classmethod
     def get_test_config(cls, test_category: str) -> Dict[str, Any]:
         """Get configuration for a specific test category."""
-        config_map = {
-            "validity": cls.VALIDITY_CONFIG,
-            "topology": cls.TOPOLOGY_CONFIG,
-            "area": cls.AREA_CONFIG,
-            "duplicate": cls.DUPLICATE_CONFIG,
-            "polygon": cls.POLYGON_CONFIG,
-            "linestring": cls.LINESTRING_CONFIG,
-            "point": cls.POINT_CONFIG,
-            "confidence": cls.CONFIDENCE_CONFIG,
-            "performance": cls.PERFORMANCE_CONFIG,
-        }
-        return config_map.get(test_category, {})
+        return cls._CONFIG_MAP.get(test_category, _EMPTY_CONFIG)
     
     @classmethod
     def get_area_thresholds(cls, unit_scale: float = 1.0) -> Dict[str, float]:
         """Get area validation thresholds scaled for coordinate system."""
+        if unit_scale == 1.0 and cls._DEFAULT_AREA_THRESHOLDS is not None:
+            return cls._DEFAULT_AREA_THRESHOLDS
         base = cls.AREA_CONFIG
         scale_sq = unit_scale * unit_scale  # Area scales with square of linear scale
         return {
@@ -229,6 +228,8 @@ class TestConfig:
     @classmethod
     def get_length_thresholds(cls, unit_scale: float = 1.0) -> Dict[str, float]:
         """Get length validation thresholds scaled for coordinate system."""
+        if unit_scale == 1.0 and cls._DEFAULT_LENGTH_THRESHOLDS is not None:
+            return cls._DEFAULT_LENGTH_THRESHOLDS
         base = cls.AREA_CONFIG
         return {
             "zero_threshold": base["zero_length_threshold"],
@@ -261,20 +262,107 @@ class TestConfig:
         # For now, return default
         return cls.UNIT_SCALING["default_unit_scale"]
     
+    @classmethod
+    def confidence_reduction_for(cls, num_points: int) -> float:
+        """Get the complexity-based confidence multiplier for a geometry's point count."""
+        return _POINT_REDUCTIONS[bisect_left(_POINT_BUCKETS, num_points)]
+    
     @classmethod
     def should_fail_on_invalid(cls) -> bool:
         """Check if invalid geometries should fail tests."""
-        return cls.VALIDITY_CONFIG.get("fail_on_invalid", True)
+        return should_fail_on_invalid()
     
     @classmethod
     def get_duplicate_result_level(cls, duplicate_type: str = "exact") -> str:
         """Get the result level for duplicate detections."""
-        if duplicate_type == "composite":
-            return cls.DUPLICATE_CONFIG.get("composite_duplicate_result", "FAIL")
-        elif duplicate_type == "near":
-            return cls.DUPLICATE_CONFIG.get("near_duplicate_result", "WARNING")
-        else:  # exact
-            return cls.DUPLICATE_CONFIG.get("exact_duplicate_result", "WARNING")
+        return get_duplicate_result_level(duplicate_type)
+
+
+# ============================================================================
+# MODULE-LEVEL ACCESSORS
+# ============================================================================
+
+# Category -> config dispatch and unscaled thresholds, built once at import time
+_EMPTY_CONFIG = MappingProxyType({})
+TestConfig._CONFIG_MAP = {
+    "validity": TestConfig.VALIDITY_CONFIG,
+    "topology": TestConfig.TOPOLOGY_CONFIG,
+    "area": TestConfig.AREA_CONFIG,
+    "duplicate": TestConfig.DUPLICATE_CONFIG,
+    "polygon": TestConfig.POLYGON_CONFIG,
+    "linestring": TestConfig.LINESTRING_CONFIG,
+    "point": TestConfig.POINT_CONFIG,
+    "confidence": TestConfig.CONFIDENCE_CONFIG,
+    "performance": TestConfig.PERFORMANCE_CONFIG,
+}
+TestConfig._DEFAULT_AREA_THRESHOLDS = TestConfig.get_area_thresholds()
+TestConfig._DEFAULT_LENGTH_THRESHOLDS = TestConfig.get_length_thresholds()
+
+# Bound once so hot-path accessors are a single dict lookup
+_ENABLED = TestConfig.ENABLED_TEST_CATEGORIES
+_VALIDITY = TestConfig.VALIDITY_CONFIG
+_DUPLICATE = TestConfig.DUPLICATE_CONFIG
+
+# Flattened, read-only view of every setting keyed by dotted path
+# (e.g. "area.zero_area_threshold"), built once at import time.
+# TestConfig stays the place to edit values; cfg() is the fast read path.
+# Built after _CONFIG_MAP is filled in so every section is included.
+_FLAT = MappingProxyType({
+    f"{section}.{key}": value
+    for section, config in {
+        "enabled": TestConfig.ENABLED_TEST_CATEGORIES,
+        "unit_scaling": TestConfig.UNIT_SCALING,
+        **TestConfig._CONFIG_MAP,
+    }.items()
+    for key, value in config.items()
+})
+
+
+_MISSING = object()
+
+
+def cfg(key: str, default: Any = _MISSING) -> Any:
+    """
+    Read a config value by dotted path, e.g. cfg("validity.fail_on_invalid").
+    Without a default, an unknown key raises KeyError instead of returning None.
+    """
+    if default is _MISSING:
+        return _FLAT[key]
+    return _FLAT.get(key, default)
+
+
+def is_test_enabled(test_category: str) -> bool:
+    """Check if a test category is enabled."""
+    return _ENABLED.get(test_category, False)
+
+
+def should_fail_on_invalid() -> bool:
+    """Check if invalid geometries should fail tests."""
+    return _VALIDITY.get("fail_on_invalid", True)
+
+
+def get_duplicate_result_level(duplicate_type: str = "exact") -> str:
+    """Get the result level for duplicate detections."""
+    if duplicate_type == "composite":
+        return _DUPLICATE.get("composite_duplicate_result", "FAIL")
+    elif duplicate_type == "near":
+        return _DUPLICATE.get("near_duplicate_result", "WARNING")
+    else:  # exact
+        return _DUPLICATE.get("exact_duplicate_result", "WARNING")
+
+
+# Complexity buckets for confidence scoring, built once at import time.
+# bisect_left maps count <= 100 -> 0, <= 1000 -> 1, else -> 2,
+# matching the strict ">" comparisons against each threshold.
+_POINT_BUCKETS = (
+    TestConfig.CONFIDENCE_CONFIG["complex_geometry_point_threshold"],
+    TestConfig.CONFIDENCE_CONFIG["very_complex_geometry_point_threshold"],
+)
+_POINT_REDUCTIONS = (
+    1.0,
+    TestConfig.CONFIDENCE_CONFIG["complex_geometry_confidence_reduction"],
+    TestConfig.CONFIDENCE_CONFIG["very_complex_geometry_confidence_reduction"],
+)
 
 
 # ============================================================================
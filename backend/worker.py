@@ -5,14 +5,19 @@ Handles scheduled dataset monitoring and spatial QA checks
 
 import os
 import asyncio
-from celery import Celery
+import threading
+from celery import Celery, group
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
+from kombu.serialization import register
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from datetime import datetime, timezone
 import logging
 
 from config import settings
-from database import AsyncSessionLocal, Dataset
+from database import AsyncSessionLocal, Dataset, failure_retry_at, in_failure_backoff
 from services.geometry_service import GeometryService
 
 # Configure logging
@@ -27,11 +32,21 @@ celery_app = Celery(
     include=["worker"]
 )
 
+# orjson for task/result payloads; plain json stays accepted for messages
+# published by older clients
+register(
+    "orjson",
+    lambda obj: orjson.dumps(obj).decode(),
+    orjson.loads,
+    content_type="application/x-orjson",
+    content_encoding="utf-8",
+)
+
 # Celery configuration
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer="orjson",
+    accept_content=["orjson", "json"],
+    result_serializer="orjson",
     timezone="UTC",
     enable_utc=True,
     task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
@@ -47,6 +62,84 @@ celery_app.conf.update(
     },
 )
 
+# One long-lived asyncio.Runner per worker thread (one per process under the
+# default prefork pool). Tasks reuse its event loop instead of building and
+# tearing down a loop on every invocation, which also keeps pooled asyncpg
+# connections bound to a loop that stays alive.
+_RUNNERS = threading.local()
+
+try:
+    import uvloop
+    _LOOP_FACTORY = uvloop.new_event_loop
+except ImportError:  # uvloop isn't available on Windows
+    _LOOP_FACTORY = None
+
+
+def _get_runner() -> asyncio.Runner:
+    """Return this thread's asyncio.Runner, creating it on first use."""
+    runner = getattr(_RUNNERS, "runner", None)
+    if runner is None:
+        runner = _RUNNERS.runner = asyncio.Runner(loop_factory=_LOOP_FACTORY)
+    return runner
+
+
+def _run_async(coro):
+    """Run a coroutine to completion on the persistent runner."""
+    return _get_runner().run(coro)
+
+
+@worker_process_init.connect
+def _start_runner(**kwargs):
+    """Create the persistent runner when a worker process boots."""
+    _get_runner()
+
+
+@worker_process_shutdown.connect
+def _close_runner(**kwargs):
+    """Close the persistent runner (and its loop) when a worker process exits."""
+    runner = getattr(_RUNNERS, "runner", None)
+    if runner is not None:
+        runner.close()
+        _RUNNERS.runner = None
+
+
+# Schedule rows for monitor_all_datasets, reused until the datasets table changes.
+# Every insert/update (including last_check_at writes) bumps updated_at, so the
+# max(updated_at) watermark is enough to tell when the cached rows are stale.
+# The ORM's onupdate doesn't run for raw text() UPDATEs, which set it explicitly.
+_SCHEDULE_CACHE = {"watermark": None, "rows": []}
+
+# Statements built once at import so each beat tick reuses them
+_WATERMARK_STMT = select(func.max(Dataset.updated_at))
+_SCHEDULE_STMT = select(
+    Dataset.id,
+    Dataset.name,
+    Dataset.next_check_at,
+    Dataset.connection_status,
+    Dataset.next_retry_at,
+).where(Dataset.is_active == True)
+
+
+async def _get_due_datasets(db: AsyncSession, now):
+    """
+    Return (id, name) of due datasets, re-reading schedules only when the watermark advances.
+    Datasets still inside a failure backoff are left out, so they aren't dispatched at all.
+    """
+    watermark = (await db.execute(_WATERMARK_STMT)).scalar()
+    if watermark is None or watermark != _SCHEDULE_CACHE["watermark"]:
+        result = await db.execute(_SCHEDULE_STMT)
+        _SCHEDULE_CACHE["rows"] = result.all()
+        _SCHEDULE_CACHE["watermark"] = watermark
+    
+    # next_check_at is stored as UTC wall time
+    now_utc = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return [
+        (row.id, row.name)
+        for row in _SCHEDULE_CACHE["rows"]
+        if (row.next_check_at is None or row.next_check_at <= now_utc)
+        and not in_failure_backoff(row, now)
+    ]
+
 
 async def async_monitor_dataset(dataset_id: str):
     """
@@ -54,6 +147,7 @@ async def async_monitor_dataset(dataset_id: str):
     This is the core QA monitoring functionality.
     """
     async with AsyncSessionLocal() as db:
+        dataset = None
         try:
             # Get dataset
             result = await db.execute(
@@ -65,10 +159,16 @@ async def async_monitor_dataset(dataset_id: str):
                 logger.warning(f"Dataset {dataset_id} not found or inactive")
                 return {"status": "skipped", "reason": "inactive"}
             
+            # Known-failing datasets wait out their backoff instead of reconnecting every interval
+            if in_failure_backoff(dataset, datetime.now(timezone.utc)):
+                logger.info("Skipping %s: backing off after %s failed checks",
+                            dataset.name, dataset.consecutive_failures)
+                return {"status": "skipped", "reason": "backoff", "dataset_id": dataset_id}
+            
             # Create geometry service
             geometry_service = GeometryService(db)
             
-            logger.info(f"Starting QA monitoring for dataset: {dataset.name}")
+            logger.info("Starting QA monitoring for dataset: %s", dataset.name)
             
             # This is where the magic happens:
             # 1. Connect to user's PostGIS database
@@ -80,20 +180,28 @@ async def async_monitor_dataset(dataset_id: str):
                 dataset, force_reimport=False
             )
             
+            # The service rolls back on failure, which expires the dataset
+            await db.refresh(dataset)
+            
             # Update dataset last check time
-            from datetime import datetime, timezone
-            dataset.last_check_at = datetime.now(timezone.utc)
+            now = datetime.now(timezone.utc)
+            dataset.last_check_at = now
             dataset.connection_status = "success" if response.status == "SUCCESS" else "failed"
             if response.status == "FAILED":
                 dataset.connection_error = response.error_message
+                dataset.consecutive_failures += 1
+                dataset.next_retry_at = failure_retry_at(
+                    now, dataset.consecutive_failures, dataset.check_interval_minutes
+                )
             else:
                 dataset.connection_error = None
+                dataset.consecutive_failures = 0
+                dataset.next_retry_at = None
                 
             await db.commit()
             
-            logger.info(f"QA monitoring completed for {dataset.name}: "
-                       f"{response.snapshots_created} new snapshots, "
-                       f"{response.diffs_detected} issues flagged")
+            logger.info("QA monitoring completed for %s: %s new snapshots, %s issues flagged",
+                        dataset.name, response.snapshots_created, response.diffs_detected)
             
             return {
                 "status": "completed",
@@ -108,8 +216,16 @@ async def async_monitor_dataset(dataset_id: str):
             
             # Update dataset with error status
             if dataset:
+                await db.rollback()
+                await db.refresh(dataset)
+                now = datetime.now(timezone.utc)
+                dataset.last_check_at = now
                 dataset.connection_status = "failed"
                 dataset.connection_error = str(e)
+                dataset.consecutive_failures += 1
+                dataset.next_retry_at = failure_retry_at(
+                    now, dataset.consecutive_failures, dataset.check_interval_minutes
+                )
                 await db.commit()
             
             return {
@@ -125,17 +241,11 @@ def monitor_dataset(self, dataset_id: str):
     Celery task to monitor a single dataset.
     This runs the spatial QA checks and flags problematic geometries.
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
-        result = loop.run_until_complete(async_monitor_dataset(dataset_id))
-        return result
+        return _run_async(async_monitor_dataset(dataset_id))
     except Exception as e:
         logger.error(f"Task failed for dataset {dataset_id}: {e}")
         raise self.retry(countdown=60, max_retries=3)
-    finally:
-        loop.close()
 
 
 @celery_app.task
@@ -147,54 +257,27 @@ def monitor_all_datasets():
     async def async_dispatch():
         async with AsyncSessionLocal() as db:
             try:
-                # Get all active datasets
-                result = await db.execute(
-                    select(Dataset).where(Dataset.is_active == True)
-                )
-                datasets = result.scalars().all()
-                
-                from datetime import datetime, timedelta, timezone
                 now = datetime.now(timezone.utc)
-                dispatched = 0
+                datasets = await _get_due_datasets(db, now)
                 
-                for dataset in datasets:
-                    # Check if it's time to monitor this dataset
-                    if dataset.last_check_at is None:
-                        # Never checked - do it now
-                        should_check = True
-                    else:
-                        # Check based on interval
-                        next_check = dataset.last_check_at + timedelta(
-                            minutes=dataset.check_interval_minutes
-                        )
-                        should_check = now >= next_check
-                    
-                    if should_check:
-                        logger.info(f"Dispatching monitoring task for dataset: {dataset.name}")
-                        monitor_dataset.delay(str(dataset.id))
-                        dispatched += 1
-                    else:
-                        # Log next check time
-                        next_check = dataset.last_check_at + timedelta(
-                            minutes=dataset.check_interval_minutes
-                        )
-                        logger.debug(f"Dataset {dataset.name} next check: {next_check}")
+                due_tasks = []
+                for dataset_id, name in datasets:
+                    logger.info("Dispatching monitoring task for dataset: %s", name)
+                    due_tasks.append(monitor_dataset.s(str(dataset_id)))
                 
-                logger.info(f"Dispatched {dispatched} monitoring tasks")
-                return {"dispatched": dispatched, "total_datasets": len(datasets)}
+                # Enqueue all due datasets in one pipelined broker round-trip
+                if due_tasks:
+                    group(due_tasks).apply_async()
+                dispatched = len(due_tasks)
+                
+                logger.info("Dispatched %s monitoring tasks", dispatched)
+                return {"dispatched": dispatched, "due_datasets": len(datasets)}
                 
             except Exception as e:
                 logger.error(f"Error in monitor_all_datasets: {e}")
                 return {"error": str(e)}
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        result = loop.run_until_complete(async_dispatch())
-        return result
-    finally:
-        loop.close()
+    return _run_async(async_dispatch())
 
 
 if __name__ == "__main__":
@@ -1,21 +1,48 @@
 """
 dbfriend-cloud Development Worker
 Simpler async worker without Redis dependency for local development
-Implements dual-timer architecture: change detection + quality checks
+Runs change detection on a timer; quality checks are user-triggered via the API
 """
 
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import queue
+import random
+import signal
+from logging.handlers import QueueHandler, QueueListener
+
+import asyncpg
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
-from database import AsyncSessionLocal, Dataset
+from database import (
+    DATASET_CHANGED_CHANNEL,
+    AsyncSessionLocal,
+    Dataset,
+    claim_due_datasets,
+    engine,
+    failure_retry_at,
+    fetch_seconds_until_next_check,
+)
 from services.geometry_service import GeometryService
 
-# Configure logging
+# Configure logging: records go through a queue to a listener thread, so
+# formatting and stderr writes happen off the event loop
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+
+_log_queue_handler = QueueHandler(_log_queue)
+# QueueHandler bakes the formatted message into the record; keep it bare so
+# the listener's formatter adds the prefix exactly once
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=logging.INFO,  # Back to normal logging
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[_log_queue_handler],
 )
 logger = logging.getLogger("dbfriend-cloud.dev-worker")
 
@@ -24,124 +51,298 @@ class DevelopmentWorker:
     """Development worker focused on change detection only. Quality checks now user-controlled."""
     
     def __init__(self):
-        self.change_detection_interval = 60  # seconds
+        # Safety-net poll in seconds; cycles normally run when a dataset is due or on NOTIFY
+        self.change_detection_interval = 300
         self.running = False
+        self._wakeup = asyncio.Event()
+        self._listen_conn = None
     
     async def start(self):
         """Start the change detection monitoring system."""
         logger.info("🚀 Starting dbfriend-cloud development monitoring...")
         logger.info("💡 This replaces Celery+Redis for easier local development")
-        logger.info(f"📊 Change detection: every {self.change_detection_interval}s")
+        logger.info("📊 Change detection: when datasets are due, at least every %ss",
+                    self.change_detection_interval)
         logger.info("🔍 Quality checks: now user-controlled via frontend")
         
         self.running = True
+        await self._listen_for_dataset_changes()
+        
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # Windows loops have no signal handlers; Ctrl+C still raises KeyboardInterrupt
+                pass
         
         # Start change detection loop only
         change_task = asyncio.create_task(self._change_detection_loop())
         
         try:
+            # The loop exits on its own once stop() is called, after finishing its current cycle
             await change_task
-        except KeyboardInterrupt:
-            logger.info("👋 Shutting down development worker...")
-            self.running = False
-            change_task.cancel()
+        finally:
+            if self._listen_conn is not None:
+                await self._listen_conn.close()
+    
+    def stop(self):
+        """Ask the change detection loop to finish its current datasets and exit."""
+        if self.running:
+            logger.info("👋 Shutting down development worker... (press Ctrl+C again to force)")
+        self.running = False
+        self._wakeup.set()
+        # A second signal gets the default behaviour, so a hung dataset can't block exit
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.remove_signal_handler(sig)
+            except NotImplementedError:
+                pass
+    
+    async def _listen_for_dataset_changes(self):
+        """LISTEN for dataset changes so new or rescheduled datasets are picked up immediately."""
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        try:
+            self._listen_conn = await asyncpg.connect(dsn)
+            await self._listen_conn.add_listener(DATASET_CHANGED_CHANNEL, self._on_dataset_changed)
+            logger.info("👂 Listening for dataset changes")
+        except Exception as e:
+            logger.warning(f"⚠️ Dataset change notifications unavailable, polling only: {e}")
+            self._listen_conn = None
+    
+    def _on_dataset_changed(self, connection, pid, channel, payload):
+        """asyncpg notification callback: wake the change detection loop."""
+        self._wakeup.set()
     
     async def _change_detection_loop(self):
-        """Main loop for detecting data changes (runs every minute)."""
+        """Main loop for detecting data changes (runs whenever a dataset is due)."""
+        loop = asyncio.get_running_loop()
         while self.running:
             try:
-                await self._monitor_dataset_changes()
-                await asyncio.sleep(self.change_detection_interval)
+                # Clear before the cycle so changes made while it runs trigger another one
+                self._wakeup.clear()
+                # Measure the interval from the cycle start on the monotonic clock,
+                # so time spent monitoring doesn't stretch the polling cadence; up to
+                # 10% jitter keeps several workers from polling in lockstep
+                deadline = loop.time() + self.change_detection_interval * random.uniform(0.9, 1.0)
+                claimed = await self._monitor_dataset_changes()
+                
+                # A full batch means more datasets may be waiting; claim them right away
+                if claimed >= settings.DEV_MONITOR_BATCH_SIZE:
+                    continue
+                
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"⚠️ Change detection cycle overran the {self.change_detection_interval}s "
+                                   f"interval by {-remaining:.1f}s, starting the next cycle now")
+                    continue
+                await self._wait_for_next_check(remaining)
             except Exception as e:
                 logger.error(f"❌ Error in change detection loop: {e}")
-                await asyncio.sleep(30)  # Shorter retry interval
+                # Shorter retry interval, cut short by stop()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=30)
+                except asyncio.TimeoutError:
+                    pass
     
-
+    async def _wait_for_next_check(self, max_wait: float):
+        """Sleep until the next dataset is due, a dataset change is notified, or max_wait elapses."""
+        async with AsyncSessionLocal() as db:
+            until_next = await fetch_seconds_until_next_check(db)
+        
+        sleep_for = max_wait
+        if until_next is not None:
+            sleep_for = min(sleep_for, max(1.0, until_next))
+        
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+        except asyncio.TimeoutError:
+            pass
     
-    async def _monitor_dataset_changes(self):
-        """Monitor all datasets for CHANGES only."""
+    async def _monitor_dataset_changes(self) -> int:
+        """Monitor a batch of due datasets for CHANGES only, several at a time. Returns the batch size."""
+        # One cycle session claims the due datasets and writes their statuses back
         async with AsyncSessionLocal() as db:
             try:
-                # Get all active datasets
-                from sqlalchemy import select
-                result = await db.execute(
-                    select(Dataset).where(Dataset.is_active == True)
-                )
-                datasets = result.scalars().all()
-                
-                now = datetime.now(timezone.utc)
-                monitored = 0
-                
-                logger.info(f"🔍 Checking {len(datasets)} active datasets for changes...")
-                
-                for dataset in datasets:
-                    # Check if it's time to monitor this dataset
-                    if dataset.last_check_at is None:
-                        # Never checked - do it now
-                        should_check = True
-                        logger.info(f"📋 {dataset.name}: First check (never checked before, dataset_id: {dataset.id})")
-                    else:
-                        # Check based on interval
-                        next_check = dataset.last_check_at + timedelta(
-                            minutes=dataset.check_interval_minutes
-                        )
-                        should_check = now >= next_check
-                        
-                        if should_check:
-                            logger.info(f"⏰ {dataset.name}: Time for scheduled check (interval: {dataset.check_interval_minutes}m)")
-                        else:
-                            logger.debug(f"⏳ {dataset.name}: Next check at {next_check}")
-                    
-                    if should_check:
-                        try:
-                            # Create geometry service with fresh session for each dataset
-                            async with AsyncSessionLocal() as dataset_db:
-                                geometry_service = GeometryService(dataset_db)
-                                
-                                logger.info(f"🔍 Starting change monitoring for dataset: {dataset.name}")
-                                
-                                # Use the new change monitoring method
-                                response = await geometry_service.monitor_dataset_changes(
-                                    dataset, force_reimport=False
-                                )
-                                
-                                # Update dataset status in main session
-                                dataset.last_check_at = datetime.now(timezone.utc)
-                                dataset.connection_status = "success" if response.status == "SUCCESS" else "failed"
-                                if response.status == "FAILED":
-                                    dataset.connection_error = response.error_message
-                                else:
-                                    dataset.connection_error = None
-                                    
-                                await db.commit()
-                                
-                                logger.info(f"✅ Change monitoring completed for {dataset.name}: "
-                                           f"{response.snapshots_created} new snapshots, "
-                                           f"{response.diffs_detected} issues flagged")
-                                
-                                monitored += 1
-                            
-                        except Exception as e:
-                            logger.error(f"❌ Error monitoring dataset {dataset.name}: {e}")
-                            # Update dataset with error status
-                            dataset.connection_status = "failed"
-                            dataset.connection_error = str(e)
-                            await db.commit()
-                
-                logger.info(f"✅ Change detection cycle completed: {monitored}/{len(datasets)} datasets checked")
-                
+                # Claiming stamps last_check_at, so another worker won't pick these up
+                datasets = await claim_due_datasets(db, settings.DEV_MONITOR_BATCH_SIZE)
+                # Commit the claim straight away to release the row locks
+                await db.commit()
+                # Detach the claimed rows: consumers only read their loaded column
+                # values, and nothing should reach back into this session meanwhile
+                db.expunge_all()
             except Exception as e:
                 logger.error(f"❌ Error in change detection cycle: {e}")
-                await db.rollback()
+                return 0
+            
+            # Idle cycles are the common case; keep them out of the INFO log
+            if not datasets:
+                logger.debug("💤 No datasets due for change detection")
+                return 0
+            
+            logger.info("🔍 %s active datasets due for change detection...", len(datasets))
+            
+            # Monitoring is I/O-bound on the remote PostGIS sources, so a fixed
+            # pool of consumers overlaps datasets on the event loop
+            pending: asyncio.Queue[Dataset] = asyncio.Queue()
+            for dataset in datasets:
+                pending.put_nowait(dataset)
+            status_updates: list[dict] = []
+            
+            async def _consume() -> int:
+                # One session per consumer, reused for every dataset it handles;
+                # sessions can't be shared across concurrent tasks
+                consumed_ok = 0
+                # Stagger consumer start-up so they don't all hit the pool at once
+                await asyncio.sleep(random.uniform(0, 0.05))
+                consumer_db = AsyncSessionLocal()
+                geometry_service = GeometryService(consumer_db)
+                try:
+                    # Stop taking new datasets once shutdown is requested
+                    while self.running and not pending.empty():
+                        dataset = pending.get_nowait()
+                        try:
+                            if await self._monitor_single_dataset(dataset, geometry_service, status_updates):
+                                consumed_ok += 1
+                        except asyncio.TimeoutError:
+                            # The cancelled query can leave the connection unusable, so
+                            # discard it and carry on with a fresh session
+                            await self._discard_session(consumer_db)
+                            consumer_db = AsyncSessionLocal()
+                            geometry_service = GeometryService(consumer_db)
+                        except Exception as e:
+                            # Raised outside _monitor_single_dataset's own error handling
+                            logger.error(f"❌ Unhandled error monitoring dataset {dataset.name}: {e}")
+                finally:
+                    await consumer_db.close()
+                return consumed_ok
+            
+            consumers = min(settings.DEV_MONITOR_CONCURRENCY, len(datasets))
+            monitored = sum(await asyncio.gather(*(_consume() for _ in range(consumers))))
+            
+            # Datasets left unmonitored by a shutdown give their claim back, so the
+            # next worker picks them up first instead of an interval later
+            unmonitored = [pending.get_nowait().id for _ in range(pending.qsize())]
+            if unmonitored:
+                try:
+                    await db.execute(
+                        update(Dataset).where(Dataset.id.in_(unmonitored)).values(last_check_at=None)
+                    )
+                    await db.commit()
+                    logger.info("↩️ Released %s unmonitored datasets", len(unmonitored))
+                except Exception as e:
+                    logger.error(f"❌ Error releasing unmonitored datasets: {e}")
+            
+            # Write every dataset's status in one executemany and one commit
+            if status_updates:
+                try:
+                    await db.execute(update(Dataset), status_updates)
+                    await db.commit()
+                except Exception as e:
+                    logger.error(f"❌ Error saving dataset statuses: {e}")
+        
+        logger.info("✅ Change detection cycle completed: %s/%s datasets checked", monitored, len(datasets))
+        return len(datasets)
     
-
+    @staticmethod
+    async def _discard_session(db: AsyncSession):
+        """Close a session whose connection may be broken, without reusing that connection."""
+        try:
+            await db.invalidate()
+        except Exception as e:
+            logger.warning(f"⚠️ Error discarding monitoring session: {e}")
+    
+    async def _monitor_single_dataset(
+        self, dataset: Dataset, geometry_service: GeometryService, status_updates: list[dict]
+    ) -> bool:
+        """
+        Run change monitoring for one dataset and queue its status update. Returns True on success.
+        Re-raises asyncio.TimeoutError once the status is queued, so the caller can replace the session.
+        """
+        dataset_id = dataset.id
+        name = dataset.name
+        
+        logger.info("⏰ %s: Time for scheduled check (interval: %sm, dataset_id: %s)",
+                    name, dataset.check_interval_minutes, dataset_id)
+        
+        # A hung source database shouldn't hold a consumer for the rest of the cycle
+        timeout = min(settings.DIFF_TIMEOUT_SECONDS, dataset.check_interval_minutes * 30)
+        
+        try:
+            logger.info("🔍 Starting change monitoring for dataset: %s", name)
+            
+            # Use the new change monitoring method
+            response = await asyncio.wait_for(
+                geometry_service.monitor_dataset_changes(dataset, force_reimport=False),
+                timeout=timeout,
+            )
+            
+            # Queue dataset status; written for the whole cycle at once.
+            # last_check_at was already stamped by the database when the dataset was claimed,
+            # and retries are scheduled from that database timestamp rather than this clock.
+            status = response.status
+            failures = dataset.consecutive_failures + 1 if status == "FAILED" else 0
+            status_updates.append({
+                "id": dataset_id,
+                "connection_status": "success" if status == "SUCCESS" else "failed",
+                "connection_error": response.error_message if status == "FAILED" else None,
+                "consecutive_failures": failures,
+                "next_retry_at": (
+                    failure_retry_at(dataset.last_check_at, failures, dataset.check_interval_minutes)
+                    if failures else None
+                ),
+            })
+            
+            logger.info("✅ Change monitoring completed for %s: %s new snapshots, %s issues flagged",
+                        name, response.snapshots_created, response.diffs_detected)
+            
+            return True
+            
+        except Exception as e:
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            error = f"monitor timeout after {timeout}s" if timed_out else str(e)
+            logger.error(f"❌ Error monitoring dataset {name}: {error}")
+            # Queue error status alongside the rest of the cycle, before anything
+            # else touches the session, so a failing rollback can't lose it
+            failures = dataset.consecutive_failures + 1
+            status_updates.append({
+                "id": dataset_id,
+                "connection_status": "failed",
+                "connection_error": error,
+                "consecutive_failures": failures,
+                "next_retry_at": failure_retry_at(
+                    dataset.last_check_at, failures, dataset.check_interval_minutes
+                ),
+            })
+            if timed_out:
+                raise
+            try:
+                await geometry_service.db.rollback()
+            except Exception as rollback_error:
+                logger.warning(f"⚠️ Rollback failed after error in {name}: {rollback_error}")
+            return False
+        
+        finally:
+            # Don't carry this dataset's snapshots into the next one in the identity map
+            geometry_service.db.expunge_all()
 
 
 async def main():
     """Main entry point for development worker."""
     worker = DevelopmentWorker()
-    await worker.start()
+    _log_listener.start()
+    try:
+        await worker.start()
+    finally:
+        _log_listener.stop()
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:  # uvloop isn't available on Windows
+        asyncio.run(main())
+    else:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main()) 
\ No newline at end of file